@@ -13,6 +13,9 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os 
+import blend_composition
+import cost_kernel
+import telemetry
 def createFolder(directory):
     try:
         if not os.path.exists(directory):
@@ -52,18 +55,14 @@ days = 3
 reserve = (days * capacity * 24 / 1e3) / efficiency  # MWh_fuel
 
 # Compute annualized CAPEX + OPEX (used in all LCOE calculations)
-money = energy = 0
-for y in range(1, CCGT_lifetime + 1):
-    df = (1 + WACC) ** y
-    money += (FOM * capacity + E * VOM / 1000) / df
-    energy += E / df
+af = cost_kernel.annuity_factor(WACC, CCGT_lifetime)
+money = (FOM * capacity + E * VOM / 1000) * af
+energy = E * af
 
-# LCOS function
+# LCOS function (storage CAPEX above already includes fcr_s)
 def lcos(reserve, share, CAPEX):
-    initial = reserve * share * CAPEX
-    money = sum((FOM_storage * initial) / ((1 + WACC) ** y) for y in range(1, storage_lifetime + 1))
-    energy = sum(E / ((1 + WACC) ** y) for y in range(1, storage_lifetime + 1))
-    return (initial + money) / energy * 1000
+    return cost_kernel.lcos(E, reserve, CAPEX, share=share, FOM_storage=FOM_storage, fcr_s=0,
+                            WACC=WACC, lifetime=storage_lifetime)
 
 # Fuel definitions
 fuels = {
@@ -91,70 +90,61 @@ def get_retrofit_cost(f1, f2, X1):
 pairs = [("H2-cavern", "NH3"), ("H2-cavern", "CH4"), ("CH4", "NH3"),("CH4", "NH3c"),("H2-cavern", "NH3c"),
          ("H2-tank", "NH3"), ("H2-tank", "CH4"),("H2-tank", "NH3c")]
 shares = np.linspace(0, 1, 1001)
-all_results = []
-
-for f1, f2 in pairs:
-    for X1 in shares:
-        X2 = 1 - X1
-           
-        # Fuel and storage costs
-        fuel_cost = X1 * fuels[f1]["cost"] + X2 * fuels[f2]["cost"]
-        lcos1 = lcos(reserve, X1, fuels[f1]["capex"])
-        lcos2 = lcos(reserve, X2, fuels[f2]["capex"])
-
-
-        # Retrofit and LCOE
-        retrofit_pct = get_retrofit_cost(f1, f2, X1)
-        firing = (capacity * capex * (1 + fcr_p) * (1 + retrofit_pct) + money) / energy * 1000
-        LCOE = firing + lcos1 + lcos2
-
-
-        
-        all_results.append({
-            "Blend": f"{f1}_{f2}",
-            "Fuel1": f1,
-            "Fuel2": f2,
-            "PCT":retrofit_pct,
-            "Fuel1_share": X1,
-            "Fuel2_share": X2,
-            "LCOE": LCOE,
-            "Fuel_cost": fuel_cost / efficiency ,
-            "LCOS": lcos1 + lcos2,
-            "Firing": firing
-        })
-        
-
-# Convert to DataFrame
-df_all = pd.DataFrame(all_results)
-
-
-
 LHV={'H2-tank':10.8,'H2-cavern':10.8,'NH3c':10.8,'NH3':12.7,'CH4':35}
 
-def energy_to_volume_share(X_E, LHV1, LHV2):
-    # Converts energy share to volumetric share
-    if X_E == 0:
-        return 0
-    elif X_E == 1:
-        return 1
-    return (X_E * LHV2) / (LHV1 * (1 - X_E) + X_E * LHV2)
-
-# Assume you have your dataframe called df (with Fuel1, Fuel2, Fuel1_share (energy))
-# and LHV
-
-vol_shares_1 = []
-vol_shares_2 = []
-
-for _, row in df_all.iterrows():
-    f1, f2 = row['Fuel1'], row['Fuel2']
-    X_E1 = row['Fuel1_share']  # energy share
-    X_V1 = energy_to_volume_share(X_E1, LHV[f1], LHV[f2])
-    X_V2 = 1 - X_V1
-    vol_shares_1.append(X_V1)
-    vol_shares_2.append(X_V2)
-
-df_all['Fuel1_vol_share'] = vol_shares_1
-df_all['Fuel2_vol_share'] = vol_shares_2
+
+def binary_results(pairs, shares):
+    # Figure 4 table: every pair at every Fuel 1 energy share, with volumetric shares
+    all_results = []
+
+    with telemetry.stage('binary sweep'):
+        for f1, f2 in pairs:
+            for X1 in shares:
+                X2 = 1 - X1
+               
+                # Fuel and storage costs
+                fuel_cost = X1 * fuels[f1]["cost"] + X2 * fuels[f2]["cost"]
+                lcos1 = lcos(reserve, X1, fuels[f1]["capex"])
+                lcos2 = lcos(reserve, X2, fuels[f2]["capex"])
+
+
+                # Retrofit and LCOE
+                retrofit_pct = get_retrofit_cost(f1, f2, X1)
+                firing = (capacity * capex * (1 + fcr_p) * (1 + retrofit_pct) + money) / energy * 1000
+                LCOE = firing + lcos1 + lcos2
+
+
+            
+                all_results.append({
+                    "Blend": f"{f1}_{f2}",
+                    "Fuel1": f1,
+                    "Fuel2": f2,
+                    "PCT":retrofit_pct,
+                    "Fuel1_share": X1,
+                    "Fuel2_share": X2,
+                    "LCOE": LCOE,
+                    "Fuel_cost": fuel_cost / efficiency ,
+                    "LCOS": lcos1 + lcos2,
+                    "Firing": firing
+                })
+            
+
+    # Convert to DataFrame
+    with telemetry.stage('results DataFrame'):
+        df_all = pd.DataFrame(all_results)
+
+    # Energy shares to volumetric shares, all blends at once
+    with telemetry.stage('vol conversion'):
+        vol_shares = blend_composition.convert_shares(df_all[['Fuel1_share', 'Fuel2_share']],
+                                                      df_all[['Fuel1', 'Fuel2']],
+                                                      src='energy', dst='volume', LHV=LHV)
+
+    df_all['Fuel1_vol_share'] = vol_shares[:, 0]
+    df_all['Fuel2_vol_share'] = vol_shares[:, 1]
+    return df_all
+
+
+df_all = binary_results(pairs, shares)
 
 
 
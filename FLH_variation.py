@@ -13,6 +13,9 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os 
+import cost_kernel
+import flh_surface
+import telemetry
 def createFolder(directory):
     try:
         if not os.path.exists(directory):
@@ -55,18 +58,14 @@ def get_retrofit_cost(f1):
 
 # LCOE function
 def lcoe(E,retrofit_pct):
-    initial =capacity * (capex*(1+retrofit_pct)) * (1 + fcr_p) 
-    money = sum((FOM * capacity + E * VOM / 1000) / ((1 + WACC) ** y) for y in range(1, CCGT_lifetime + 1))
-    energy = sum(E / ((1 + WACC) ** y) for y in range(1, CCGT_lifetime + 1))
-    return (initial + money) / energy * 1000
+    return cost_kernel.lcoe(E, retrofit_pct, capex=capex, capacity=capacity, FOM=FOM, VOM=VOM,
+                            fcr_p=fcr_p, WACC=WACC, lifetime=CCGT_lifetime)
 
 
 # LCOS function
-def lcos(reserve, CAPEX):
-    initial = reserve  * (CAPEX) * (1 + fcr_s) 
-    money = sum((FOM_storage * initial) / ((1 + WACC) ** y) for y in range(1, storage_lifetime + 1))
-    energy = sum(E / ((1 + WACC) ** y) for y in range(1, storage_lifetime + 1))
-    return (initial + money) / energy * 1000
+def lcos(E, reserve, CAPEX):
+    return cost_kernel.lcos(E, reserve, CAPEX, FOM_storage=FOM_storage, fcr_s=fcr_s,
+                            WACC=WACC, lifetime=storage_lifetime)
 
 
 
@@ -154,28 +153,31 @@ fuels_cost=pd.DataFrame({'CAPEX':costs},index=fuels)
 
 FLH_range = range(100, 3001, 100)   
 day_range = range(1, 22)          
-results = []
-
-# Loop over combinations
-for tech in fuels:
-    retrofit_pct = get_retrofit_cost(tech)
-    for FLH in FLH_range:
-        for day in day_range:
-            E = FLH * capacity  # MWh/year
-            reserve = (day * capacity * 24 / 1e3) / efficiency  # MWh_fuel
-            val = lcoe(E,retrofit_pct) + lcos(reserve, fuels_cost.loc[tech, 'CAPEX'])
-
-            # Store results in a dict
-            results.append({
-                'FLH': FLH,
-                'days': day,
-                'tech': tech,
-                'value': val,
-                'firing': lcoe(E,retrofit_pct),
-                'storage': lcos(reserve, fuels_cost.loc[tech, 'CAPEX'])
-            })
-
-df_results = pd.DataFrame(results)
+out_of_core = False  # True: also write hourly FLH x 0.05-day grids to Figures/FLH-reserve (.npy)
+
+# All tech x FLH x days combinations in one broadcast
+with telemetry.stage('FLH x days surface'):
+    df_results = flh_surface.flh_surface(fuels, fuels_cost.loc[fuels, 'CAPEX'],
+                                         [get_retrofit_cost(tech) for tech in fuels],
+                                         FLH_range, day_range, lcoe=lcoe, lcos=lcos,
+                                         capacity=capacity, efficiency=efficiency)
+
+if out_of_core:
+    with telemetry.stage('FLH x days grids'):
+        grids = flh_surface.surface_grids(fuels, fuels_cost.loc[fuels, 'CAPEX'],
+                                          [get_retrofit_cost(tech) for tech in fuels],
+                                          np.arange(1, 8761), np.arange(1, 421) * 0.05, 'Figures/FLH-reserve',
+                                          lcoe=lcoe, lcos=lcos, capacity=capacity, efficiency=efficiency)
+    grids.to_csv('Figures/FLH-reserve/summary.csv', index=False)
+    print(grids)
+
+# Reserve days at which each pair of technologies swaps rank, at every FLH
+with telemetry.stage('FLH x days crossovers'):
+    crossovers = flh_surface.crossover_days(fuels, fuels_cost.loc[fuels, 'CAPEX'],
+                                            [get_retrofit_cost(tech) for tech in fuels],
+                                            FLH_range, (min(day_range), max(day_range)), lcoe=lcoe, lcos=lcos,
+                                            capacity=capacity, efficiency=efficiency)
+crossovers.dropna().to_csv('Figures/LCOE - FLH-reserve crossovers.csv', index=False)
 
 
 
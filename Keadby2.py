@@ -15,6 +15,9 @@ import plotly.graph_objects as go
 import plotly.io as pio
 pio.renderers.default = 'browser'
 import os 
+import figure_export
+import telemetry
+import workbook
 def createFolder(directory):
     try:
         if not os.path.exists(directory):
@@ -23,8 +26,9 @@ def createFolder(directory):
         print ('Error: Creating directory. ' +  directory)
 
 createFolder('Figures')
-df=pd.read_excel('Calculations.xlsx',sheet_name='Keadby',
-                 index_col=0,usecols=range(6),nrows=18)
+with telemetry.stage('load Keadby'):
+    df=workbook.read_excel(sheet_name='Keadby',
+                     index_col=0,usecols=range(6),nrows=18)
 
 df=df[['Retrofit Investment','H2-Storage tank', 'H2-Storage salt cavern', 'NH3-Storage',
        'CH4-Storage']]
@@ -168,5 +172,6 @@ fig.update_layout(
     yaxis=dict(tickfont=dict(size=22)),  # y-axis tick font size
 )
 
-fig.write_image("Figures/Keadby2_capital_components_breakdown.png",scale=2)
+with figure_export.batch():
+    figure_export.write_image(fig,"Figures/Keadby2_capital_components_breakdown.png",scale=2)
 fig.show()
@@ -10,12 +10,15 @@ This script reproduces figure 5 All data used are cited in the main paper.
 
 
 dpi=300
-import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
 import ternary
 from matplotlib.colors import LogNorm
 import os 
+import blend_composition
+import blend_sweep
+import cost_kernel
+import telemetry
+import ternary_plot
 def createFolder(directory):
     try:
         if not os.path.exists(directory):
@@ -24,6 +27,7 @@ def createFolder(directory):
         print ('Error: Creating directory. ' +  directory)
 
 createFolder('Figures')
+createFolder('Figures/Ternary')
 # Constants
 efficiency = 0.63
 capex = 1039.34 # EUR/kW CCGT
@@ -60,19 +64,15 @@ days = 3
 reserve = (days * capacity * 24 / 1e3) / efficiency  # MWh_fuel
 
 # Compute annualized CAPEX + OPEX (used in all LCOE calculations)
-money = energy = 0
-for y in range(1, CCGT_lifetime + 1):
-    df = (1 + WACC) ** y
-    money += (FOM * capacity + E * VOM / 1000) / df
-    energy += E / df
+af = cost_kernel.annuity_factor(WACC, CCGT_lifetime)
+money = (FOM * capacity + E * VOM / 1000) * af
+energy = E * af
 
 
 # LCOS function
 def lcos(reserve, share, CAPEX):
-    initial = reserve * share * CAPEX * (1 + fcr_s) 
-    money = sum((FOM_storage * initial) / ((1 + WACC) ** y) for y in range(1, storage_lifetime + 1))
-    energy = sum(E / ((1 + WACC) ** y) for y in range(1, storage_lifetime + 1))
-    return (initial + money) / energy * 1000
+    return cost_kernel.lcos(E, reserve, CAPEX, share=share, FOM_storage=FOM_storage, fcr_s=fcr_s,
+                            WACC=WACC, lifetime=storage_lifetime)
 
 # Fuels and properties
 fuels = {
@@ -85,48 +85,55 @@ fuels = {
 
 # Blending triplets
 triplets = [("H2", "NH3", "CH4"), ("NH3", "NH3c", "CH4"),("H2", "NH3c", "CH4")]
-share_grid = np.linspace(0, 1, 501)
-
-results_tri = []
-
-for f1, f2, f3 in triplets:
-    for X1 in share_grid:
-        for X2 in share_grid:
-            if X1 + X2 > 1:
-                continue
-            
-            X3 = 1 - X1 - X2         
-
-            fuel_cost = X1 * fuels[f1]["cost"] + X2 * fuels[f2]["cost"] + X3 * fuels[f3]["cost"]
-            lcos1 = lcos(reserve, X1, fuels[f1]["capex"])
-            lcos2 = lcos(reserve, X2, fuels[f2]["capex"])
-            lcos3 = lcos(reserve, X3, fuels[f3]["capex"])
-            
-            if 'NH3' in [f1,f2,f3]:
-                retrofit_pct = 0.167702659 # Retrofit cost (constant here)
-            else:
-                retrofit_pct = 0.134098756 # Retrofit cost (constant here)
-
-            firing_base = (capacity * capex * (1 + fcr_p) * (1 + retrofit_pct) + money) / energy * 1000
-
-            LCOE =  lcos1 + lcos2 + lcos3 +  firing_base
-
-            results_tri.append({
-                "Blend": f"{f1}_{f2}_{f3}",
-                "PCT": f"{retrofit_pct}",
-                f"{f1}_share": X1,
-                f"{f2}_share": X2,
-                f"{f3}_share": X3,
-                "LCOE": LCOE,
-                "MCOE": fuel_cost/efficiency,
-                "LCOE & MC": fuel_cost/efficiency + LCOE,
-                "LCOS": lcos1 + lcos2 + lcos3 
-                
-            })
-
-df_tri = pd.DataFrame(results_tri)
-
-df_tri.replace(np.nan,0,inplace=True)
+share_steps = 500  # 0.002 share resolution
+mesh = 'uniform'  # or 'adaptive': refined mesh, drawn with ternary_plot.tripcolor
+out_of_core = False  # True: also write 0.0001-resolution grids to Figures/Ternary/grids (.npy)
+
+
+def get_retrofit_cost(triplet):
+    if 'NH3' in triplet:
+        return 0.167702659 # Retrofit cost (constant here)
+    else:
+        return 0.134098756 # Retrofit cost (constant here)
+
+
+firing = {}
+for triplet in triplets:
+    retrofit_pct = get_retrofit_cost(triplet)
+    firing[triplet] = (retrofit_pct, (capacity * capex * (1 + fcr_p) * (1 + retrofit_pct) + money) / energy * 1000)
+
+LHV = {x: fuels[x]['LHV'] for x in fuels}
+
+
+def ternary_results(share_steps):
+    # Figure 5 table of all triplets, with the plotting shares (share x LHV, as in the published figure)
+    with telemetry.stage('ternary sweep'):
+        if mesh == 'adaptive':
+            df_tri = blend_sweep.adaptive_ternary_sweep(fuels, triplets, firing,
+                                                        lambda share, CAPEX: lcos(reserve, share, CAPEX),
+                                                        efficiency=efficiency, LHV=LHV)
+        else:
+            df_tri = blend_sweep.ternary_sweep(fuels, triplets, share_steps, firing,
+                                               lambda share, CAPEX: lcos(reserve, share, CAPEX),
+                                               efficiency=efficiency)
+
+    # Converted once for all blends
+    with telemetry.stage('vol conversion'):
+        df_tri[[f'{x}_vol' for x in fuels]] = blend_composition.convert_shares(
+            df_tri[[f'{x}_share' for x in fuels]], list(fuels), src='volume', dst='energy', LHV=LHV)
+    return df_tri
+
+
+df_tri = ternary_results(share_steps)
+
+if out_of_core:
+    # 10000 steps per edge: evaluated tile by tile into memory-mapped grids
+    with telemetry.stage('ternary grids'):
+        grids = blend_sweep.ternary_grids(fuels, triplets, 10000, firing,
+                                          lambda share, CAPEX: lcos(reserve, share, CAPEX),
+                                          'Figures/Ternary/grids', efficiency=efficiency)
+    grids.to_csv('Figures/Ternary/grids/summary.csv', index=False)
+    print(grids)
 
 
 def draw_guides(point, color='r', linewidth=1, linestyle='--'):
@@ -143,92 +150,88 @@ def draw_guides(point, color='r', linewidth=1, linestyle='--'):
 scale = 100
 
 
-for blend in df_tri.Blend.unique():
-    print(blend)
-    for arg in ['LCOE','MCOE','LCOE & MC']:
-        print(arg)
-        
-        df=df_tri.loc[df_tri.Blend==blend].copy()
-        
-        bottom, left, right = blend.split('_')
-        for x in blend.split('_'):
-            df[f'{x}_vol'] = (df_tri[f'{x}_share'] * fuels[x]['LHV']) /\
-                (df_tri[f'{bottom}_share'] * fuels[bottom]['LHV'] +
-                 df_tri[f'{left}_share'] * fuels[left]['LHV'] +
-                 df_tri[f'{right}_share'] * fuels[right]['LHV'] )
-        
-        example_points = {
-            "1": (60,30,10),
-            "2": (70,0,30),
-            "3": (0,60,40),
-            "4": (100,0,0),
-            "5": (10,20,70),
-        }
-
-        
-        ternary_data = []
-        for _, row in df.iterrows():
-            point = (
-                row[f"{bottom}_vol"] * scale,
-                row[f"{left}_vol"] * scale,
-                row[f"{right}_vol"] * scale,
+metrics = ['LCOE','MCOE','LCOE & MC']
+panels = [(blend, arg) for blend in df_tri.Blend.unique() for arg in metrics]
+
+
+def render(blend, arg, df_tri=df_tri):
+    df=df_tri.loc[df_tri.Blend==blend]
+    bottom, left, right = blend.split('_')
+    
+    example_points = {
+        "1": (60,30,10),
+        "2": (70,0,30),
+        "3": (0,60,40),
+        "4": (100,0,0),
+        "5": (10,20,70),
+    }
+
+    
+    points = df[[f"{bottom}_vol", f"{left}_vol", f"{right}_vol"]].to_numpy() * scale
+    values = df[arg].to_numpy()
+    
+    # Normalize
+    norm = LogNorm(vmin=max(values.min(), 1), vmax=values.max())
+    norm = plt.Normalize(values.min(), values.max())
+
+    # Initialize plot
+    fig, ax = plt.subplots(figsize=(6, 5))
+    tax = ternary.TernaryAxesSubplot(ax=ax, scale=scale)
+
+    tax.get_axes().set_frame_on(False)
+    fig.patch.set_facecolor('white')
+    tax.get_axes().set_facecolor('white')
+
+    tax.set_title(f"{arg} for {blend} Blend", fontsize=14,pad=20)
+    tax.boundary()
+    tax.gridlines(multiple=10, color="snow", linewidth=1)
+    
+    
+    tax.bottom_axis_label(f"{bottom} [%]", fontsize=14, fontweight='bold', offset=0.18)
+    tax.left_axis_label(f"{left} [%]", fontsize=14, fontweight='bold', offset=0.18)
+    tax.right_axis_label(f"{right} [%]", fontsize=14, fontweight='bold', offset=0.18)
+
+    cmap = plt.cm.viridis
+    if mesh == 'adaptive':
+        ternary_plot.tripcolor(tax, points, values, cmap, norm)
+    else:
+        ternary_plot.scatter(tax, points, values, cmap, norm, s=2,alpha=0.7)
+    
+    # Colorbar
+    sm = plt.cm.ScalarMappable(cmap=cmap, norm=norm)
+    sm.set_array([])
+    cbar = plt.colorbar(sm, ax=tax.get_axes(), pad=0.1)
+    cbar.set_label(f"{arg} (EUR/MWh)", fontsize=12)
+    if arg == 'MCOE':
+        for label, coords in example_points.items():
+            tax.scatter([coords], color='k', s=180, zorder=2,alpha=1)
+            tax.annotate(
+                text=label,
+                position=coords,
+                fontsize=13,
+                color='gold',              
+                horizontalalignment='center',
+                verticalalignment='center'  # Center text inside the point
             )
-            ternary_data.append((point, np.sum(row[arg])))
-        
-        # Normalize
-        values = [v for _, v in ternary_data]
-        
-        norm = LogNorm(vmin=max(min(values), 1), vmax=max(values))
-        norm = plt.Normalize(min(values), max(values))
-
-        # Initialize plot
-        fig, ax = plt.subplots(figsize=(6, 5))
-        tax = ternary.TernaryAxesSubplot(ax=ax, scale=scale)
-
-        tax.get_axes().set_frame_on(False)
-        fig.patch.set_facecolor('white')
-        tax.get_axes().set_facecolor('white')
-
-        tax.set_title(f"{arg} for {blend} Blend", fontsize=14,pad=20)
-        tax.boundary()
-        tax.gridlines(multiple=10, color="snow", linewidth=1)
-        
-        
-        tax.bottom_axis_label(f"{bottom} [%]", fontsize=14, fontweight='bold', offset=0.18)
-        tax.left_axis_label(f"{left} [%]", fontsize=14, fontweight='bold', offset=0.18)
-        tax.right_axis_label(f"{right} [%]", fontsize=14, fontweight='bold', offset=0.18)
-
-        cmap = plt.cm.viridis
-        for (point, lcoe) in ternary_data:
-            color = cmap(norm(lcoe))
-            tax.scatter([point], color=color, s=2,alpha=0.7)
-        
-        # Colorbar
-        sm = plt.cm.ScalarMappable(cmap=cmap, norm=norm)
-        sm.set_array([])
-        cbar = plt.colorbar(sm, ax=tax.get_axes(), pad=0.1)
-        cbar.set_label(f"{arg} (EUR/MWh)", fontsize=12)
-        if arg == 'MCOE':
-            for label, coords in example_points.items():
-                tax.scatter([coords], color='k', s=180, zorder=2,alpha=1)
-                tax.annotate(
-                    text=label,
-                    position=coords,
-                    fontsize=13,
-                    color='gold',              
-                    horizontalalignment='center',
-                    verticalalignment='center'  # Center text inside the point
-                )
-            # for coords in example_points.values():
-            #     draw_guides(coords)
-
-        tax.ticks(axis='lbr', multiple=20,linewidth=1, offset=0.04, tick_formats="%d")
-
-        tax.clear_matplotlib_ticks()
-        tax._redraw_labels()
-        plt.savefig(f'Figures/Ternary/{blend} - {arg}',dpi=dpi)
-        plt.close(fig)
-        plt.show()
+        # for coords in example_points.values():
+        #     draw_guides(coords)
+
+    tax.ticks(axis='lbr', multiple=20,linewidth=1, offset=0.04, tick_formats="%d")
+
+    tax.clear_matplotlib_ticks()
+    tax._redraw_labels()
+    fig.savefig(f'Figures/Ternary/{blend} - {arg}',dpi=dpi)
+    plt.close(fig)
+
+
+if __name__ == '__main__':
+    for blend in df_tri.Blend.unique():
+        print(blend)
+        for arg in metrics:
+            print(arg)
+            with telemetry.stage(f'render {blend} - {arg}'):
+                render(blend, arg)
+            plt.show()
 
 
 
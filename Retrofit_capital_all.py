@@ -18,6 +18,9 @@ import plotly.io as pio
 import numpy as np
 pio.renderers.default = 'browser'
 import os 
+import figure_export
+import telemetry
+import workbook
 def createFolder(directory):
     try:
         if not os.path.exists(directory):
@@ -27,8 +30,9 @@ def createFolder(directory):
 
 createFolder('Figures')
 
-df=pd.read_excel('Calculations.xlsx',sheet_name='UK',
-                  index_col=0,usecols=range(7),nrows=19)
+with telemetry.stage('load UK'):
+    df=workbook.read_excel(sheet_name='UK',
+                      index_col=0,usecols=range(7),nrows=19)
 
 df/=1e9
 # temp=df['CCGT Investment Cost'].mean()
@@ -185,7 +189,8 @@ fig.update_layout(
 )
 
 # 
-fig.write_image("Figures/UK_capital_components_breakdown_all.png",scale=2)
+# Both countries are exported together at the end
+exports = [figure_export.spec(fig,"Figures/UK_capital_components_breakdown_all.png",scale=2)]
 
 fig.show()
 
@@ -209,8 +214,9 @@ fig.show()
 
 
 
-df=pd.read_excel('Calculations.xlsx',sheet_name='DE',
-                  index_col=0,usecols=range(7),nrows=19)
+with telemetry.stage('load DE'):
+    df=workbook.read_excel(sheet_name='DE',
+                      index_col=0,usecols=range(7),nrows=19)
 
 df/=1e9
 # temp=df['CCGT Investment Cost'].mean()
@@ -367,7 +373,10 @@ fig.update_layout(
 )
 
 # 
-fig.write_image("Figures/DE_capital_components_breakdown_all.png",scale=2)
+exports.append(figure_export.spec(fig,"Figures/DE_capital_components_breakdown_all.png",scale=2))
+with figure_export.batch():
+    for s in exports:
+        figure_export.write_image(**s)
 
 fig.show()
 
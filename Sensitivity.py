@@ -15,6 +15,9 @@ import seaborn as sns
 import itertools
 import inspect
 import os 
+import cost_kernel
+import sensitivity_engine
+import telemetry
 def createFolder(directory):
     try:
         if not os.path.exists(directory):
@@ -36,14 +39,8 @@ WACC = 0.0581
 storage_lifetime = 20
 CCGT_lifetime = 35
 
-# Storage CAPEX (EUR/MWh_fuel)
-store_capex = {
-    "H2-Tank": {"capex": 1091.02 },
-    "H2-Cavern": {"capex": 321.86},
-    "NH3": {"capex": 157.64 },
-    "CH4": {"capex": 182.07 },
-    "NH3c": {"capex": 157.64 },
-}
+# Storage CAPEX (EUR/MWh_fuel), shared with monte_carlo.py
+store_capex = {fuel: {"capex": c} for fuel, c in cost_kernel.store_capex.items()}
 
 FOM_storage = 0.02
 days = 3
@@ -51,39 +48,25 @@ days = 3
 
 # LCOE function
 def lcoe(E,retrofit_pct):
-    initial =capacity * (capex*(1+retrofit_pct)) * (1 + fcr_p) 
-    money = sum((FOM * capacity + E * VOM / 1000) / ((1 + WACC) ** y) for y in range(1, CCGT_lifetime + 1))
-    energy = sum(E / ((1 + WACC) ** y) for y in range(1, CCGT_lifetime + 1))
-    return (initial + money) / energy * 1000
+    return cost_kernel.lcoe(E, retrofit_pct, capex=capex, capacity=capacity, FOM=FOM, VOM=VOM,
+                            fcr_p=fcr_p, WACC=WACC, lifetime=CCGT_lifetime)
 
 
 # LCOS function
 def lcos(E,reserve, CAPEX):
-    initial = reserve  * CAPEX * (1 + fcr_s) 
-    money = sum((FOM_storage * initial) / ((1 + WACC) ** y) for y in range(1, storage_lifetime + 1))
-    energy = sum(E / ((1 + WACC) ** y) for y in range(1, storage_lifetime + 1))
-    return (initial + money) / energy * 1000
+    return cost_kernel.lcos(E, reserve, CAPEX, FOM_storage=FOM_storage, fcr_s=fcr_s,
+                            WACC=WACC, lifetime=storage_lifetime)
 
 def get_retrofit_cost(f1):
-    if f1 == 'H2-Tank' or f1 == 'H2-Cavern' or f1 == 'NH3c':
-        return 0.0798
-    if f1 == 'NH3':
-        return 0.1134
-    else:
-        return 0
-
+    return cost_kernel.retrofit.get(f1, 0)
 
-fuels=pd.DataFrame(0,index=store_capex.keys(),columns=['Production', 'Synthesis', 'Shipping','Distribution','Regasification'])
 
-fuels.loc['H2-Tank']=[49.48 , 9.58 , 24.26 , 22.72 , 8.47]
-fuels.loc['H2-Cavern']=[49.48 , 9.58 , 24.26 , 22.72 , 8.47]
-fuels.loc['NH3']=[49.48 , 34 , 9.08 , 3.44 ,0 ]
-fuels.loc['NH3c']=[49.48 , 34 , 9.08 , 3.44 ,0 ]
-fuels.loc['CH4']=[97.19,0,0,4.71,0]
+fuels=pd.DataFrame.from_dict(cost_kernel.supply_chain,orient='index',columns=cost_kernel.supply_chain_components)
 
 fuels['Cracking']=0
 
-fuels.loc['NH3c','Cracking']=fuels.loc['NH3'].sum()*0.2
+fuels.loc['NH3c','Cracking']=fuels.loc['NH3'].sum()*cost_kernel.cracking
+
 
 
 
@@ -95,40 +78,28 @@ fuels.loc['NH3c','Cracking']=fuels.loc['NH3'].sum()*0.2
 
 
 
+# Storage CAPEX and retrofit cost per fuel, in the order of fuels.index
+storage_capex = np.array([store_capex[fuel]['capex'] for fuel in fuels.index])
+retrofit_cost = np.array([get_retrofit_cost(fuel) for fuel in fuels.index])
+
 
 def run_lcoe_analysis(capex, FOM, VOM, FLH,
                       FOM_storage, days, store,Retrofit):
-
+    # Vectorized: every argument may be an array broadcasting against the fuel axis (last)
     capacity = 38e6
     E = FLH * capacity
     reserve = (days * capacity * 24 / 1e3) / efficiency
-    
-    def lcoe(E,retrofit_pct):
-        initial =capacity * (capex*(1+retrofit_pct)) * (1 + fcr_p) 
-        money = sum((FOM * capacity + E * VOM / 1000) / ((1 + WACC) ** y) for y in range(1, 35 + 1))
-        energy = sum(E / ((1 + WACC) ** y) for y in range(1, 35 + 1))
-        return (initial + money) / energy * 1000
-
-    def lcos(E,reserve, CAPEX):
-        initial = reserve * CAPEX * (1 + fcr_s) 
-        money = sum((FOM_storage * initial) / ((1 + WACC) ** y) for y in range(1, storage_lifetime + 1))
-        energy = sum(E / ((1 + WACC) ** y) for y in range(1, storage_lifetime + 1))
-        return (initial + money) / energy * 1000
-
-    fuels_copy = fuels.copy()
-    
-    for fuel in fuels_copy.index:
-        fuels_copy.loc[fuel,'Storage'] = lcos(E, reserve, store_capex[fuel]['capex'] * (store))
-        fuels_copy.loc[fuel,'Firing'] = lcoe(E, get_retrofit_cost(fuel) * (Retrofit))
-
-    fuels_copy['LCOE'] =  fuels_copy['Storage'] + fuels_copy['Firing']
-    
-    
-    return fuels_copy['LCOE']
+
+    storage = cost_kernel.lcos(E, reserve, storage_capex * store, FOM_storage=FOM_storage, fcr_s=fcr_s,
+                               WACC=WACC, lifetime=storage_lifetime)
+    firing = cost_kernel.lcoe(E, retrofit_cost * Retrofit, capex=capex, capacity=capacity, FOM=FOM, VOM=VOM,
+                              fcr_p=fcr_p, WACC=WACC, lifetime=35)
+
+    return storage + firing
 
 # Baseline values
-baseline_LCOE= run_lcoe_analysis(capex, FOM, VOM, FLH,
-                      FOM_storage, days, store=1,Retrofit=1)
+baseline_LCOE= pd.Series(run_lcoe_analysis(capex, FOM, VOM, FLH,
+                      FOM_storage, days, store=1,Retrofit=1), index=fuels.index)
 
 
 
@@ -147,45 +118,13 @@ params = {
 
 
 
-LCOE_sensitivity_results = []
-
 # Range: ±2% to ±20%
 percentage_changes = np.arange(-0.2, 0.21, 0.02)
 
-for param, base_value in params.items():
-    for pct_change in percentage_changes:
-
-        new_value = base_value * (1 + pct_change)
-        param_values = params.copy()
-        
-#        if param =='days':
- #           new_value = base_value * (1 + pct_change)
-  #          new_value = 3 + (pct_change * 10)  # between 1 and 5 days
-
-     
-        param_values[param] = new_value
-
-        lcoe_values = run_lcoe_analysis(
-            param_values['capex'], 
-            param_values['FOM'], 
-            param_values['VOM'], 
-            param_values['FLH'],
-            param_values['FOM_storage'], 
-            param_values['days'], 
-            param_values['store'], 
-            param_values['Retrofit'])
-        for fuel in lcoe_values.index:
-            delta = (lcoe_values[fuel] - baseline_LCOE[fuel])
-            LCOE_sensitivity_results.append({
-                'Parameter': param,
-                'Change (%)': pct_change * 100,
-                'Fuel': fuel,
-                'ΔLCOE (EUR/MWh)': delta
-            })
-
-
-# Create DataFrame
-sensitivity_df = pd.DataFrame(LCOE_sensitivity_results)
+# All parameters x changes x fuels in one evaluation
+with telemetry.stage('LCOE sensitivity'):
+    sensitivity_df = sensitivity_engine.oat_sensitivity(run_lcoe_analysis, params, percentage_changes,
+                                                        fuels.index, 'ΔLCOE (EUR/MWh)')
 sensitivity_df.Parameter.replace('capex','CCGT CAPEX',inplace=True)
 sensitivity_df.Parameter.replace('store','Storage CAPEX',inplace=True)
 
@@ -279,34 +218,20 @@ fuels.loc['NH3c-Local','Cracking']=fuels.loc['NH3c-Local'].sum()*0.2
 
 def run_mcoe_analysis(Production,Synthesis, Shipping, 
                       Distribution, Regasification, Cracking):
+    # Vectorized: components are per-fuel arrays (last axis follows fuels.index)
+    return (np.asarray(Production) + np.asarray(Synthesis) + np.asarray(Shipping) +
+            np.asarray(Distribution) + np.asarray(Regasification) + np.asarray(Cracking)) / 0.63
 
 
-    fuels_copy = fuels.copy()
-    
-    fuels_copy.Production= Production
-    fuels_copy.Synthesis= Synthesis
-    fuels_copy.Shipping= Shipping
-    fuels_copy.Distribution= Distribution
-    fuels_copy.Regasification= Regasification
-    fuels_copy.Cracking= Cracking
-
-    fuels_copy['Marginal Cost']=fuels_copy.sum(axis=1)/0.63
-
-    
-    return fuels_copy['Marginal Cost']
-
 
 
-
-MCOE_sensitivity_results = []
-
-baseline_MCOE = run_mcoe_analysis(
+baseline_MCOE = pd.Series(run_mcoe_analysis(
                       Production = fuels.Production,
                       Synthesis=fuels.Synthesis,
                       Shipping=fuels.Shipping,
                       Distribution=fuels.Distribution,
                       Regasification=fuels.Regasification,
-                      Cracking=fuels.Cracking)
+                      Cracking=fuels.Cracking), index=fuels.index)
 
 
 
@@ -323,35 +248,12 @@ params = {
 
 
 
-MCOE_sensitivity_results = []
-
 # Range: ±2% to ±20%
 percentage_changes = np.arange(-0.2, 0.21, 0.02)
 
-for param, base_value in params.items():
-    for pct_change in percentage_changes:
-        new_value = base_value * (1 + pct_change)
-        param_values = params.copy()
-        param_values[param] = new_value
-
-        mcoe_values = run_mcoe_analysis(
-            param_values['Production'],
-            param_values['Synthesis'],
-            param_values['Shipping'],
-            param_values['Distribution'],
-            param_values['Regasification'],
-            param_values['Cracking'])
-
-        for fuel in mcoe_values.index:
-            delta = (mcoe_values[fuel] - baseline_MCOE[fuel])
-            MCOE_sensitivity_results.append({
-                'Parameter': param,
-                'Change (%)': pct_change * 100,
-                'Fuel': fuel,
-                'ΔLCOE (EUR/MWh)': delta
-            })
-
-sensitivity_df = pd.DataFrame(MCOE_sensitivity_results)
+with telemetry.stage('MCOE sensitivity'):
+    sensitivity_df = sensitivity_engine.oat_sensitivity(run_mcoe_analysis, params, percentage_changes,
+                                                        fuels.index, 'ΔLCOE (EUR/MWh)')
 
 
 
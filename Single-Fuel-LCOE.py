@@ -9,11 +9,13 @@ This script reproduces figure 3 All data used are cited in the main paper.
 """
 
 
-import pandas as pd
 import plotly.graph_objects as go
 import plotly.io as pio
 pio.renderers.default = 'browser'
 import os 
+import figure_export
+import telemetry
+import workbook
 def createFolder(directory):
     try:
         if not os.path.exists(directory):
@@ -22,7 +24,8 @@ def createFolder(directory):
         print ('Error: Creating directory. ' +  directory)
 
 createFolder('Figures')
-df=pd.read_excel('Calculations.xlsx',sheet_name='Firing Comparison')
+with telemetry.stage('load Firing Comparison'):
+    df=workbook.read_excel(sheet_name='Firing Comparison')
 
 df.set_index('Route', inplace=True)
 df.index
@@ -238,7 +241,8 @@ fig.update_yaxes(
 )
 
 fig.show()
-fig.write_image("Figures/LCOE_components_breakdown.png",scale=4)
+with figure_export.batch():
+    figure_export.write_image(fig,"Figures/LCOE_components_breakdown.png",scale=4)
 # 
 # fig.write_image("LCOE_components_breakdown.pdf")
 
@@ -9,11 +9,13 @@ This script reproduces figure 2 All data used are cited in the main paper.
 """
 
 
-import pandas as pd
 import plotly.graph_objects as go
 import plotly.io as pio
 pio.renderers.default = 'browser'
 import os 
+import figure_export
+import telemetry
+import workbook
 def createFolder(directory):
     try:
         if not os.path.exists(directory):
@@ -22,7 +24,8 @@ def createFolder(directory):
         print ('Error: Creating directory. ' +  directory)
 
 createFolder('Figures')
-df=pd.read_excel('Calculations.xlsx',sheet_name='Single Fuel_New')
+with telemetry.stage('load Single Fuel_New'):
+    df=workbook.read_excel(sheet_name='Single Fuel_New')
 
 df.set_index('Route', inplace=True)
 
@@ -179,7 +182,8 @@ fig.update_layout(
 fig.update_layout(annotations=annotations)
 
 
-fig.write_image("Figures/cost_components_breakdown.png",scale=2)
+with figure_export.batch():
+    figure_export.write_image(fig,"Figures/cost_components_breakdown.png",scale=2)
 
 fig.show()
 
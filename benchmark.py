@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Anas Abuzayed © 2025
+https://github.com/AnasAbuzayed/H2_CCGT
+
+Description:
+Benchmarks of the cost kernels, blend sweeps, renderers and workbook
+loading at several problem sizes. Every case is timed `--repeat` times
+(best and median wall time) and run once more under tracemalloc for its
+peak memory. Results are written as JSON together with the commit and the
+library versions, so runs of different commits can be compared with
+--compare and scaling curves plotted from the `size` field.
+
+Figure scripts write their outputs into a temporary working directory.
+
+Usage:
+    python benchmark.py --output bench.json
+    python benchmark.py ternary_sweep lcoe_batched --repeat 10
+    python benchmark.py --quick
+    python benchmark.py --compare before.json after.json
+
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import runpy
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+import numpy as np
+
+import blend_optimizer
+import blend_sweep
+import cost_kernel
+import flh_surface
+import reproduce
+import sensitivity_engine
+import workbook
+
+ROOT = reproduce.ROOT
+
+E = 1000 * cost_kernel.capacity
+reserve = cost_kernel.storage_reserve(3)
+
+# Storage CAPEX and retrofit cost of the FLH_variation.py technologies
+techs = {'Hydrogen Tank': 1091.02, 'Hydrogen Cavern': 321.86, 'Ammonia Cracking': 157.64,
+         'Ammonia': 157.64, 'Biomethane': 182.07}
+retrofit = [0.0798, 0.0798, 0.0798, 0.1134, 0]
+
+
+def _namespace(script):
+    # Script globals without its __main__ block
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return runpy.run_path(os.path.join(ROOT, script), run_name='benchmark')
+
+
+def _consume(chunks):
+    return sum(len(c) for c in chunks)
+
+
+# Each benchmark maps a size to a zero-argument callable (setup is not timed)
+
+def lcoe_single(size):
+    return lambda: [cost_kernel.lcoe(E, 0.0798) for _ in range(size)]
+
+
+def lcoe_batched(size):
+    pct = np.linspace(0, 0.2, size)
+    return lambda: cost_kernel.lcoe(E, pct)
+
+
+def lcos_single(size):
+    return lambda: [cost_kernel.lcos(E, reserve, 1091.02) for _ in range(size)]
+
+
+def lcos_batched(size):
+    capex = np.linspace(100, 1100, size)
+    return lambda: cost_kernel.lcos(E, reserve, capex)
+
+
+_loaded = {}
+
+
+def _script(script):
+    # Loaded once: running a script also renders its figures
+    if script not in _loaded:
+        _loaded[script] = _namespace(script)
+    return _loaded[script]
+
+
+def binary_sweep(size):
+    # The figure 4 table of Double_final_v2.py at `size` share steps
+    ns = _script('Double_final_v2.py')
+    shares = np.linspace(0, 1, size)
+    return lambda: ns['binary_results'](ns['pairs'], shares)
+
+
+def nfuel_sweep(size):
+    # `size` fuels at 20 share steps
+    combo = [tuple(blend_optimizer.fuels)[:size]]
+    return lambda: _consume(blend_sweep.sweep(combo, 20))
+
+
+def ternary_sweep(size):
+    # The figure 5 table of LCOE_Ternary_final_v2.py at `size` share steps
+    ns = _script('LCOE_Ternary_final_v2.py')
+    return lambda: ns['ternary_results'](size)
+
+
+def ternary_render(size):
+    # One panel of figure 5 with the data of a `size`-step sweep
+    import matplotlib.pyplot as plt
+    ns = _script('LCOE_Ternary_final_v2.py')
+    df = ns['ternary_results'](size)
+
+    def render():
+        ns['render'](*ns['panels'][0], df_tri=df)
+        plt.close('all')
+    return render
+
+
+def _sensitivity():
+    return _script('Sensitivity.py')
+
+
+def lcoe_analysis(size):
+    # One-at-a-time sweep of run_lcoe_analysis over `size` changes per parameter
+    ns = _sensitivity()
+    params = {'capex': ns['capex'], 'FOM': ns['FOM'], 'VOM': ns['VOM'], 'FLH': ns['FLH'],
+              'FOM_storage': ns['FOM_storage'], 'days': ns['days'], 'store': 1, 'Retrofit': 1}
+    changes = np.linspace(-0.2, 0.2, size)
+    return lambda: sensitivity_engine.oat_sensitivity(ns['run_lcoe_analysis'], params, changes,
+                                                      ns['baseline_LCOE'].index)
+
+
+def mcoe_analysis(size):
+    ns = _sensitivity()
+    changes = np.linspace(-0.2, 0.2, size)
+    return lambda: sensitivity_engine.oat_sensitivity(ns['run_mcoe_analysis'], ns['params'], changes,
+                                                      ns['fuels'].index)
+
+
+def flh_days_surface(size):
+    # FLH step of `size` hours between 1 and 8760, reserve days in 0.05 steps up to 21
+    FLH = np.arange(size, 8761, size)
+    days = np.arange(1, 421) * 0.05
+    return lambda: flh_surface.flh_surface(list(techs), list(techs.values()), retrofit, FLH, days)
+
+
+def flh_crossovers(size):
+    # Rank-crossover days of every tech pair at `size` FLH points
+    FLH = np.linspace(1, 8760, size)
+    return lambda: flh_surface.crossover_days(list(techs), list(techs.values()), retrofit, FLH, days=(0, 21))
+
+
+def workbook_load(size):
+    # size: 'parse' (empty cache), 'cache' (Parquet cache) or 'memo' (in-process)
+    def load():
+        if size != 'memo':
+            workbook._memo.clear()
+        if size == 'parse':
+            cache = tempfile.mkdtemp()
+            previous, workbook.CACHE_DIR = workbook.CACHE_DIR, cache
+        try:
+            for sheet, kwargs in workbook.sheets.items():
+                workbook.read_excel(sheet_name=sheet, **kwargs)
+        finally:
+            if size == 'parse':
+                workbook.CACHE_DIR = previous
+                shutil.rmtree(cache, ignore_errors=True)
+    if size != 'parse':
+        load()
+    return load
+
+
+# name -> (benchmark, sizes, what the size counts); --quick runs the first size only
+benchmarks = {
+    'lcoe_single': (lcoe_single, [1000], 'calls'),
+    'lcoe_batched': (lcoe_batched, [10 ** 3, 10 ** 5, 10 ** 7], 'points'),
+    'lcos_single': (lcos_single, [1000], 'calls'),
+    'lcos_batched': (lcos_batched, [10 ** 3, 10 ** 5, 10 ** 7], 'points'),
+    'binary_sweep': (binary_sweep, [101, 1001, 10001], 'share steps'),
+    'nfuel_sweep': (nfuel_sweep, [2, 3, 4, 5], 'fuels'),
+    'ternary_sweep': (ternary_sweep, [100, 250, 500, 1000], 'share steps'),
+    'ternary_render': (ternary_render, [100, 250, 500], 'share steps'),
+    'lcoe_analysis': (lcoe_analysis, [21, 201, 2001], 'changes'),
+    'mcoe_analysis': (mcoe_analysis, [21, 201, 2001], 'changes'),
+    'flh_days_surface': (flh_days_surface, [100, 20, 5], 'FLH step'),
+    'flh_crossovers': (flh_crossovers, [100, 1000, 10000], 'FLH points'),
+    'workbook_load': (workbook_load, ['parse', 'cache', 'memo'], 'source'),
+}
+
+
+def measure(fn, repeat=5):
+    """Wall times of `repeat` calls and the tracemalloc peak of one more call."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'best': min(times), 'median': statistics.median(times), 'times': times, 'peak_bytes': peak}
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    import matplotlib
+    import pandas
+    return {
+        'commit': _commit(),
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pandas.__version__,
+        'matplotlib': matplotlib.__version__,
+    }
+
+
+def run(names=None, repeat=5, quick=False, out=sys.stdout):
+    """Run the benchmarks `names` (default: all) and return the JSON-able results."""
+    names = list(benchmarks) if not names else names
+    unknown = [n for n in names if n not in benchmarks]
+    if unknown:
+        raise ValueError(f"Unknown benchmark(s) {unknown}, choose from {list(benchmarks)}")
+    reproduce.setup(headless=True)
+
+    results = []
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            for name in names:
+                factory, sizes, unit = benchmarks[name]
+                for size in (sizes[:1] if quick else sizes):
+                    reproduce._reset()
+                    record = {'benchmark': name, 'size': size, 'unit': unit, 'repeat': repeat}
+                    record.update(measure(factory(size), repeat))
+                    results.append(record)
+                    print(f"{name:<18}{str(size):>10} {unit:<12}{record['best']:>10.4f} s"
+                          f"{record['peak_bytes'] / 1e6:>10.1f} MB", file=out, flush=True)
+        finally:
+            os.chdir(cwd)
+    return {'environment': environment(), 'results': results}
+
+
+def compare(old, new, out=sys.stdout):
+    """Print best-time and peak-memory ratios (new / old) of the cases both runs share."""
+    before = {(r['benchmark'], str(r['size'])): r for r in old['results']}
+    print(f"{'benchmark':<18}{'size':>10}{'time':>10}{'memory':>10}", file=out)
+    for r in new['results']:
+        o = before.get((r['benchmark'], str(r['size'])))
+        if o is None:
+            continue
+        memory = r['peak_bytes'] / o['peak_bytes'] if o['peak_bytes'] else float('nan')
+        print(f"{r['benchmark']:<18}{str(r['size']):>10}{r['best'] / o['best']:>9.2f}x{memory:>9.2f}x", file=out)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('benchmarks', nargs='*', help=f'benchmarks to run (default: all of {", ".join(benchmarks)})')
+    parser.add_argument('--repeat', type=int, default=5, help='timed calls per case')
+    parser.add_argument('--quick', action='store_true', help='only the smallest size of every benchmark')
+    parser.add_argument('--output', default=None, help='write the results to this JSON file')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='compare two result files and exit')
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f, open(args.compare[1]) as g:
+            compare(json.load(f), json.load(g))
+        sys.exit()
+
+    report = run(args.benchmarks, repeat=args.repeat, quick=args.quick)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=1)
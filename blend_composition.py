@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Anas Abuzayed © 2025
+https://github.com/AnasAbuzayed/H2_CCGT
+
+Description:
+Blend composition: conversion of N-component fuel shares between energy,
+volume and mass bases. Whole arrays of shares are converted in one call.
+
+"""
+
+import numpy as np
+
+# Volumetric LHV (MJ/m3), as in Double_final_v2.py and LCOE_Ternary_final_v2.py
+LHV = {'H2': 10.8, 'H2-tank': 10.8, 'H2-cavern': 10.8, 'NH3c': 10.8, 'NH3': 12.7, 'CH4': 35}
+
+# Gravimetric LHV (MJ/kg); cracked NH3 keeps the mass of the ammonia it came from
+LHV_mass = {'H2': 120.0, 'H2-tank': 120.0, 'H2-cavern': 120.0, 'NH3c': 21.3, 'NH3': 18.6, 'CH4': 50.0}
+
+bases = ('energy', 'volume', 'mass')
+
+
+def energy_density(fuels, basis, LHV=LHV, LHV_mass=LHV_mass):
+    """
+    Energy per unit of `basis` for every entry of `fuels`, which may be a list
+    of fuel names or an array of names (one row per blend).
+    """
+    fuels = np.asarray(fuels)
+    names, codes = np.unique(fuels, return_inverse=True)
+    if basis == 'energy':
+        table = np.ones(len(names))
+    elif basis == 'volume':
+        table = np.array([LHV[f] for f in names], dtype=float)
+    elif basis == 'mass':
+        table = np.array([LHV_mass[f] for f in names], dtype=float)
+    else:
+        raise ValueError(f"Unknown basis '{basis}', expected one of {bases}")
+    return table[codes].reshape(fuels.shape)
+
+
+def convert_shares(shares, fuels, src='energy', dst='volume', LHV=LHV, LHV_mass=LHV_mass):
+    """
+    Convert shares from the `src` basis to the `dst` basis.
+
+    shares: (..., N) array, the last axis follows `fuels`
+    fuels:  N fuel names, or an array of names broadcastable to `shares`
+    """
+    shares = np.asarray(shares, dtype=float)
+    amount = shares * energy_density(fuels, src, LHV, LHV_mass) / energy_density(fuels, dst, LHV, LHV_mass)
+    total = amount.sum(axis=-1, keepdims=True)
+    return np.divide(amount, total, out=np.zeros_like(amount), where=total != 0)
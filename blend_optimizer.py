@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Anas Abuzayed © 2025
+https://github.com/AnasAbuzayed/H2_CCGT
+
+Description:
+Cost-optimal fuel blends over an N-fuel simplex. For a fixed retrofit
+regime the LCOE, MCOE and "LCOE & MC" are linear in the energy shares, and
+so are the constraints (minimum low-carbon share, maximum H2 volume share,
+storage budget). Each regime is therefore solved as a small linear program
+and the cheapest regime wins. The piecewise retrofit cost is handled exactly
+by enumerating the sets of fuels actually present in the blend.
+
+"""
+
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import linprog
+
+import blend_composition
+import cost_kernel
+
+# Fuel costs and storage CAPEX (EUR/MWh_fuel), as in Double_final_v2.py (CAPEX before fcr_s)
+fuels = {
+    "H2-cavern": {"cost": 49.48 + 9.58 + 24.26 + 22.72 + 8.47, "capex": 321.02},
+    "H2-tank": {"cost": 49.48 + 9.58 + 24.26 + 22.72 + 8.47, "capex": 1091.02},
+    "NH3": {"cost": 49.48 + 34 + 9.08 + 3.44, "capex": 157.64},
+    "CH4": {"cost": 97.19 + 4.71, "capex": 182.07},
+    "NH3c": {"cost": (49.48 + 34 + 9.08 + 3.44) * 1.2, "capex": 157.64},
+}
+
+objectives = ('LCOE', 'MCOE', 'LCOE & MC')
+
+# Fuels reaching the combustor as hydrogen (cracked NH3 included)
+hydrogen = ('H2', 'H2-cavern', 'H2-tank', 'NH3c')
+
+
+def retrofit_pct(present):
+    # Retrofit cost share for the set of fuels in the blend (Double_final_v2.py values)
+    if 'NH3' in present:
+        return 0.1134
+    if any(f in present for f in hydrogen):
+        return 0.0798
+    return 0
+
+
+def _regimes(names, retrofit):
+    """
+    Largest fuel sets per retrofit value. A blend using any subset of such a
+    set is charged at most that value, as long as the retrofit cost does not
+    decrease when a fuel is added (true for the paper's cost data).
+    """
+    subsets = [frozenset(c) for k in range(len(names), 0, -1) for c in combinations(names, k)]
+    value = {s: retrofit(s) for s in subsets}
+    kept = []
+    for s in subsets:
+        if not any(s < t and value[t] == value[s] for t in kept):
+            kept.append(s)
+    return [(s, value[s]) for s in kept]
+
+
+def evaluate(shares, fuels=fuels, retrofit=retrofit_pct, FLH=1000, days=3, lcoe=cost_kernel.lcoe,
+             lcos=cost_kernel.lcos, efficiency=cost_kernel.efficiency, tol=1e-9):
+    """Costs of one blend given its energy shares {fuel: share}."""
+    names = list(shares)
+    X = np.array([shares[f] for f in names], dtype=float)
+    E = FLH * cost_kernel.capacity
+    reserve = cost_kernel.storage_reserve(days)
+    pct = retrofit(frozenset(f for f, x in zip(names, X) if x > tol))
+    storage = X @ lcos(E, reserve, np.array([fuels[f]['capex'] for f in names], dtype=float))
+    LCOE = lcoe(E, pct) + storage
+    MCOE = X @ np.array([fuels[f]['cost'] for f in names]) / efficiency
+    vol = blend_composition.convert_shares(X, names, src='energy', dst='volume')
+    out = {f'{f}_share': x for f, x in zip(names, X)}
+    out.update({f'{f}_vol': v for f, v in zip(names, vol)})
+    out.update({'PCT': pct, 'LCOE': LCOE, 'MCOE': MCOE, 'LCOE & MC': LCOE + MCOE, 'LCOS': storage})
+    return pd.Series(out)
+
+
+def optimize(names=None, objective='LCOE', min_low_carbon=0, max_h2_volume=1, storage_budget=None,
+             fuels=fuels, retrofit=retrofit_pct, low_carbon=None, FLH=1000, days=3,
+             lcoe=cost_kernel.lcoe, lcos=cost_kernel.lcos, efficiency=cost_kernel.efficiency, tol=1e-9):
+    """
+    Cheapest blend of `names` (default: all fuels) for `objective`.
+
+    min_low_carbon: minimum energy share of low-carbon fuels (default: all but CH4)
+    max_h2_volume:  maximum volumetric share of hydrogen at the combustor
+    storage_budget: maximum storage investment in EUR (reserve x CAPEX x (1 + fcr_s))
+    retrofit:       retrofit cost share as a function of the set of fuels present
+
+    Returns the optimum as a Series with the columns of blend_sweep.ternary_sweep.
+    """
+    if objective not in objectives:
+        raise ValueError(f"Unknown objective '{objective}', expected one of {objectives}")
+    names = list(fuels) if names is None else list(names)
+    low_carbon = [f for f in names if f != 'CH4'] if low_carbon is None else low_carbon
+    E = FLH * cost_kernel.capacity
+    reserve = cost_kernel.storage_reserve(days)
+    capex = np.array([fuels[f]['capex'] for f in names], dtype=float)
+
+    # Per unit of energy share
+    storage = lcos(E, reserve, capex)
+    fuel = np.array([fuels[f]['cost'] for f in names], dtype=float) / efficiency
+    c = {'LCOE': storage, 'MCOE': fuel, 'LCOE & MC': storage + fuel}[objective]
+
+    # Linear constraints A_ub @ X <= b_ub
+    A, b = [], []
+    if min_low_carbon > 0:
+        A.append(-np.isin(names, low_carbon).astype(float))
+        b.append(-min_low_carbon)
+    if max_h2_volume < 1:
+        # X_h2 / LHV_h2 <= max_h2_volume * sum(X / LHV)
+        inv = 1 / blend_composition.energy_density(names, 'volume')
+        A.append(inv * np.isin(names, hydrogen) - max_h2_volume * inv)
+        b.append(0)
+    if storage_budget is not None:
+        A.append(reserve * capex * (1 + cost_kernel.fcr_s))
+        b.append(storage_budget)
+
+    best, best_cost = None, np.inf
+    for present, pct in _regimes(names, retrofit):
+        bounds = [(0, 1) if f in present else (0, 0) for f in names]
+        res = linprog(c, A_ub=np.array(A) if A else None, b_ub=b or None, A_eq=np.ones((1, len(names))),
+                      b_eq=[1], bounds=bounds, method='highs')
+        if res.status != 0:
+            continue
+        result = evaluate(dict(zip(names, res.x)), fuels, retrofit, FLH, days, lcoe, lcos, efficiency, tol)
+        if result[objective] < best_cost - tol:
+            best, best_cost = result, result[objective]
+    if best is None:
+        raise ValueError("No blend satisfies the constraints")
+    return best
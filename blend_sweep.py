@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Anas Abuzayed © 2025
+https://github.com/AnasAbuzayed/H2_CCGT
+
+Description:
+Vectorized blend sweeps. The ternary sweep evaluates every (X1, X2, X3)
+point of every triplet in one broadcasted pass and returns the same columns
+as the original nested loop in LCOE_Ternary_final_v2.py. The adaptive sweep
+returns the same table on a refined mesh (see simplex_mesh.py). `sweep`
+generalizes both binary and ternary sweeps to any number of fuels: the
+lattice is enumerated lazily in fixed-size chunks and the results can be
+streamed to disk with `write`, so memory does not grow with the lattice.
+`ternary_grids` evaluates very fine ternary grids out of core (see tiled_grid.py).
+
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+import blend_composition
+import blend_optimizer
+import cost_kernel
+import result_store
+import simplex_mesh
+import tiled_grid
+
+
+def _triangle(n, p0=0, p1=None):
+    # Points p0:p1 of the integer lattice (i, j, n - i - j) of the 2-simplex, ordered as the
+    # X1/X2 nested loops; only the (n + 1,) row offsets are built besides the slice
+    start = np.concatenate(([0], np.cumsum(np.arange(n + 1, 1, -1))))
+    p1 = (n + 1) * (n + 2) // 2 if p1 is None else p1
+    p = np.arange(p0, p1)
+    i = np.searchsorted(start, p, side='right') - 1
+    j = p - start[i]
+    return np.stack((i, j, n - i - j), axis=-1)
+
+
+def simplex_grid(n):
+    """
+    Barycentric coordinates (X1, X2, X3) of the 2-simplex lattice with n steps
+    per edge. Only valid points (X1 + X2 + X3 = 1) are emitted, ordered as in
+    the X1/X2 nested loops.
+    """
+    i, j, k = _triangle(n).T
+    return i / n, j / n, k / n
+
+
+def ternary_sweep(fuels, triplets, n, firing, lcos, efficiency=cost_kernel.efficiency, dtype=np.float64):
+    """
+    LCOE, MCOE, LCOS and "LCOE & MC" of all triplets on the simplex lattice.
+
+    fuels:    {fuel: {"cost": EUR/MWh_fuel, "capex": EUR/MWh_fuel, ...}}
+    triplets: list of (f1, f2, f3)
+    firing:   {(f1, f2, f3): (retrofit_pct, firing LCOE in EUR/MWh)}
+    lcos:     vectorized lcos(share, CAPEX) in EUR/MWh
+    dtype:    float type of the result columns (float32 halves the memory)
+    """
+    X = np.stack(simplex_grid(n), axis=-1)                                     # (P, 3)
+    names = list(dict.fromkeys(f for t in triplets for f in t))
+    blends = [f"{f1}_{f2}_{f3}" for f1, f2, f3 in triplets]
+    columns = ["PCT"] + [f"{f}_share" for f in names] + ["LCOE", "MCOE", "LCOE & MC", "LCOS"]
+    store = result_store.ResultStore(len(triplets) * len(X), dict.fromkeys(columns, dtype), {"Blend": blends})
+
+    for blend, t in zip(blends, triplets):
+        cost = np.array([fuels[f]["cost"] for f in t])
+        capex = np.array([fuels[f]["capex"] for f in t])
+        storage = lcos(X, capex).sum(axis=-1)
+        LCOE = storage + firing[t][1]
+        MCOE = X @ cost / efficiency
+        values = {"Blend": blend, "PCT": firing[t][0], "LCOE": LCOE, "MCOE": MCOE,
+                  "LCOE & MC": MCOE + LCOE, "LCOS": storage}
+        values.update({f"{f}_share": X[:, k] for k, f in enumerate(t)})
+        store.append(**values)
+    return store.to_frame()
+
+
+def adaptive_ternary_sweep(fuels, triplets, firing, lcos, tol=0.002, max_depth=9, min_depth=3,
+                           efficiency=cost_kernel.efficiency, LHV=None):
+    """
+    ternary_sweep on an adaptive mesh instead of the uniform lattice.
+
+    firing: {(f1, f2, f3): (retrofit_pct, firing LCOE)} as in ternary_sweep, or a
+            callable firing(triplet, X) returning per-point arrays, e.g. for a
+            retrofit cost that depends on which fuels are present
+    LHV:    if given, the mesh is refined in the plotting coordinates of figure 5
+            (share x LHV, normalized) rather than in energy shares
+    """
+    frames = []
+    for t in triplets:
+        cost = np.array([fuels[f]["cost"] for f in t])
+        capex = np.array([fuels[f]["capex"] for f in t])
+
+        def metrics(P):
+            X = P if LHV is None else blend_composition.convert_shares(P, list(t), src='energy',
+                                                                       dst='volume', LHV=LHV)
+            pct, base = firing(t, X) if callable(firing) else firing[t]
+            storage = lcos(X, capex).sum(axis=-1)
+            LCOE = storage + base
+            MCOE = X @ cost / efficiency
+            return np.column_stack(np.broadcast_arrays(LCOE, MCOE, LCOE + MCOE, storage, pct))
+
+        P, V = simplex_mesh.refine(metrics, tol, max_depth, min_depth)
+        X = P if LHV is None else blend_composition.convert_shares(P, list(t), src='energy', dst='volume', LHV=LHV)
+        frame = {"Blend": "_".join(t), "PCT": V[:, 4]}
+        frame.update({f"{f}_share": X[:, k] for k, f in enumerate(t)})
+        frame.update({"LCOE": V[:, 0], "MCOE": V[:, 1], "LCOE & MC": V[:, 2], "LCOS": V[:, 3]})
+        frames.append(pd.DataFrame(frame))
+
+    names = list(dict.fromkeys(f for t in triplets for f in t))
+    df = pd.concat(frames, ignore_index=True)
+    df["Blend"] = pd.Categorical(df["Blend"], ["_".join(t) for t in triplets])
+    df[[f"{f}_share" for f in names]] = df[[f"{f}_share" for f in names]].fillna(0.0)
+    return df[["Blend", "PCT"] + [f"{f}_share" for f in names] + ["LCOE", "MCOE", "LCOE & MC", "LCOS"]]
+
+
+def ternary_rows(fuels, triplet, n, firing, lcos, metric="LCOE", efficiency=cost_kernel.efficiency):
+    """
+    Tile function for tiled_grid.evaluate: rows r0:r1 of the (n + 1, n + 1) grid
+    of `metric` for one triplet, indexed [X1 step, X2 step] (X3 = 1 - X1 - X2).
+    Cells outside the simplex are NaN.
+    """
+    cost = np.array([fuels[f]["cost"] for f in triplet])
+    capex = np.array([fuels[f]["capex"] for f in triplet])
+    base = firing[triplet][1]
+
+    def rows(r0, r1):
+        i, j = np.mgrid[r0:r1, 0:n + 1]
+        X = np.stack((i, j, n - i - j), axis=-1) / n
+        storage = lcos(X, capex).sum(axis=-1)
+        MCOE = X @ cost / efficiency
+        values = {"LCOE": storage + base, "MCOE": MCOE, "LCOE & MC": storage + base + MCOE, "LCOS": storage}
+        return np.where(i + j <= n, values[metric], np.nan)
+    return rows
+
+
+def ternary_grids(fuels, triplets, n, firing, lcos, folder, metrics=("LCOE", "MCOE", "LCOE & MC"),
+                  reducers=None, efficiency=cost_kernel.efficiency, dtype=np.float32, tile_rows=None):
+    """
+    Out-of-core ternary sweep: every (triplet, metric) grid is evaluated tile by
+    tile into {folder}/{blend} - {metric}.npy, so memory does not grow with n.
+
+    reducers: reducers(blend, metric) returning extra tiled_grid reducers
+              (histograms, contours) to stream each grid through
+
+    Returns one row per grid: Blend, metric, file, minimum and its shares.
+    """
+    os.makedirs(folder, exist_ok=True)
+    summary = []
+    for t in triplets:
+        blend = "_".join(t)
+        for metric in metrics:
+            path = os.path.join(folder, f"{blend} - {metric}.npy")
+            low = tiled_grid.Minimum()
+            extra = list(reducers(blend, metric)) if reducers else []
+            tiled_grid.evaluate(ternary_rows(fuels, t, n, firing, lcos, metric, efficiency), (n + 1, n + 1),
+                                path, dtype=dtype, tile_rows=tile_rows, reducers=[low] + extra)
+            i, j = low.index
+            row = {"Blend": blend, "metric": metric, "file": path, "min": low.value}
+            row.update({f"{f}_share": s for f, s in zip(t, (i / n, j / n, (n - i - j) / n))})
+            summary.append(row)
+    return pd.DataFrame(summary).fillna(0.0)
+
+
+def _blocks(d, n, size):
+    # Integer points of the (d-1)-simplex with n steps in lexicographic order, in blocks of at
+    # most `size` points, so no block grows with n
+    if d == 1:
+        yield np.array([[n]])
+    elif d == 2:
+        for i0 in range(0, n + 1, size):
+            i = np.arange(i0, min(i0 + size, n + 1))
+            yield np.stack((i, n - i), axis=-1)
+    elif d == 3:
+        total = (n + 1) * (n + 2) // 2
+        for p0 in range(0, total, size):
+            yield _triangle(n, p0, min(p0 + size, total))
+    else:
+        for i in range(n + 1):
+            for block in _blocks(d - 1, n - i, size):
+                yield np.column_stack((np.full(len(block), i), block))
+
+
+def lattice_size(d, n):
+    # Number of points of the d-component lattice with n steps
+    from math import comb
+    return comb(n + d - 1, d - 1)
+
+
+def simplex_chunks(d, n, chunk_size=1_000_000):
+    """
+    Shares (M, d) of the d-component simplex lattice with n steps, yielded in
+    chunks of `chunk_size` rows (the last one may be shorter). Points are in
+    lexicographic order, as in simplex_grid for d = 3 and the binary sweep for d = 2.
+    The lattice is generated block by block, so memory depends on chunk_size only.
+    """
+    pending, size = [], 0
+    for block in _blocks(d, n, chunk_size):
+        pending.append(block)
+        size += len(block)
+        while size >= chunk_size:
+            buf = np.concatenate(pending)
+            yield buf[:chunk_size] / n
+            pending, size = [buf[chunk_size:]], len(buf) - chunk_size
+    if size:
+        yield np.concatenate(pending) / n
+
+
+def sweep(combos, n, fuels=blend_optimizer.fuels, retrofit=blend_optimizer.retrofit_pct, support=False,
+          firing=None, lcos=None, FLH=1000, days=3, efficiency=cost_kernel.efficiency, chunk_size=1_000_000):
+    """
+    Lazy blend sweep over any combinations of any number of fuels.
+
+    combos:   list of fuel tuples of any length, e.g. [("H2-tank", "NH3", "NH3c", "CH4")]
+    retrofit: retrofit cost share as a function of a set of fuels. With support=False
+              the whole combination is charged (as in the binary and ternary scripts),
+              with support=True only the fuels with a non-zero share at each point
+    firing:   vectorized firing LCOE for a retrofit share (default cost_kernel.lcoe)
+    lcos:     vectorized lcos(share, CAPEX) (default cost_kernel.lcos)
+
+    Yields DataFrames of at most `chunk_size` rows with the columns of ternary_sweep.
+    """
+    E = FLH * cost_kernel.capacity
+    reserve = cost_kernel.storage_reserve(days)
+    if firing is None:
+        firing = lambda pct: cost_kernel.lcoe(E, pct)
+    if lcos is None:
+        lcos = lambda share, CAPEX: cost_kernel.lcos(E, reserve, CAPEX, share=share)
+    names = list(dict.fromkeys(f for c in combos for f in c))
+    blends = ["_".join(c) for c in combos]
+
+    for b, combo in enumerate(combos):
+        d = len(combo)
+        cost = np.array([fuels[f]["cost"] for f in combo], dtype=float)
+        capex = np.array([fuels[f]["capex"] for f in combo], dtype=float)
+        column = [names.index(f) for f in combo]
+        for X in simplex_chunks(d, n, chunk_size):
+            if support:
+                masks = (X > 0) @ (1 << np.arange(d))
+                uniq, inv = np.unique(masks, return_inverse=True)
+                pct = np.array([retrofit(frozenset(f for k, f in enumerate(combo) if m >> k & 1))
+                                for m in uniq], dtype=float)[inv]
+            else:
+                pct = np.full(len(X), retrofit(frozenset(combo)), dtype=float)
+            storage = lcos(X, capex).sum(axis=-1)
+            LCOE = storage + firing(pct)
+            MCOE = X @ cost / efficiency
+
+            shares = np.zeros((len(X), len(names)))
+            shares[:, column] = X
+            data = {"Blend": pd.Categorical.from_codes(np.full(len(X), b), blends), "PCT": pct}
+            data.update({f"{f}_share": shares[:, k] for k, f in enumerate(names)})
+            data.update({"LCOE": LCOE, "MCOE": MCOE, "LCOE & MC": LCOE + MCOE, "LCOS": storage})
+            yield pd.DataFrame(data)
+
+
+def write(chunks, path):
+    """
+    Stream sweep chunks to a Parquet (pyarrow) or CSV file and return the
+    number of rows written. Only one chunk is held in memory at a time.
+    """
+    rows = 0
+    if path.endswith('.parquet'):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        writer = None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+                rows += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+    else:
+        if os.path.exists(path):
+            os.remove(path)
+        for chunk in chunks:
+            chunk.to_csv(path, mode='a', header=not rows, index=False)
+            rows += len(chunk)
+    return rows
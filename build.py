@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Anas Abuzayed © 2025
+https://github.com/AnasAbuzayed/H2_CCGT
+
+Description:
+Incremental rebuild of the figures. Every figure is keyed by a hash of its
+inputs: the source of its script and of every local module it imports
+(cost parameters such as H2_capex live there), the content of the workbook
+sheets it reads (found statically from its workbook.read_excel calls) and
+the versions of the plotting libraries. A figure is rebuilt only when its
+key changed or one of its outputs is missing; the keys of the last build
+are kept in .cache/build.json.
+
+The unit of rebuild is the whole figure: a rebuilt figure reruns its script
+from the workbook load to the saved image, there are no cached intermediate
+results. A read_excel call whose arguments are not constants makes the
+figure depend on the whole workbook file.
+
+Usage:
+    python build.py                  # rebuild what changed
+    python build.py --dry-run        # list what would be rebuilt and why
+    python build.py --force fig5     # rebuild figure 5 regardless
+    python build.py --workers 8
+
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import sys
+import time
+from importlib import metadata
+
+import reproduce
+
+ROOT = reproduce.ROOT
+# Kept next to the Figures folder they describe
+STAMPS = os.path.join('.cache', 'build.json')
+
+blends = ['H2_NH3_CH4', 'NH3_NH3c_CH4', 'H2_NH3c_CH4']
+
+# Files written by every figure (relative to the working directory)
+outputs = {
+    'fig2': ['Figures/cost_components_breakdown.png'],
+    'fig3': ['Figures/LCOE_components_breakdown.png'],
+    'fig4': ['Figures/Binary.png'],
+    'fig5': [f'Figures/Ternary/{blend} - {arg}.png' for blend in blends for arg in ['LCOE', 'MCOE', 'LCOE & MC']],
+    'fig6': ['Figures/UK_capital_components_breakdown_all.png', 'Figures/DE_capital_components_breakdown_all.png'],
+    'fig7': ['Figures/Keadby2_capital_components_breakdown.png'],
+    'figA1-A2': ['Figures/LCOE-Sensitivity All.png', 'Figures/MCOE-Sensitivity All.png'],
+    'figA3': ['Figures/LCOE - FLH-reserve.png', 'Figures/LCOE - FLH-reserve crossovers.csv'],
+}
+
+# Libraries whose version changes the rendered output
+libraries = ['numpy', 'pandas', 'matplotlib', 'seaborn', 'plotly', 'kaleido', 'python-ternary']
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def modules(script):
+    """The script and every local module it imports, transitively."""
+    found, todo = {}, [os.path.join(ROOT, script)]
+    while todo:
+        path = todo.pop()
+        if path in found:
+            continue
+        with open(path, 'rb') as f:
+            source = f.read()
+        found[path] = source
+        for node in ast.walk(ast.parse(source)):
+            names = []
+            if isinstance(node, ast.Import):
+                names = [a.name for a in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                names = [node.module]
+            for name in names:
+                candidate = os.path.join(ROOT, name.split('.')[0] + '.py')
+                if os.path.exists(candidate):
+                    todo.append(candidate)
+    return found
+
+
+def _literal(node):
+    # Constants, and range() of constants (usecols=range(7)); anything else raises ValueError
+    if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == 'range'
+            and not node.keywords):
+        return range(*[ast.literal_eval(arg) for arg in node.args])
+    return ast.literal_eval(node)
+
+
+def sheets(source):
+    """
+    (sheet_name, kwargs) of every workbook.read_excel call in a script, or None
+    if one of them is not made of constants (the script may read any sheet).
+    """
+    out = []
+    for node in ast.walk(ast.parse(source)):
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and
+                node.func.attr == 'read_excel' and isinstance(node.func.value, ast.Name) and
+                node.func.value.id == 'workbook'):
+            if node.args or any(kw.arg is None for kw in node.keywords):
+                return None
+            try:
+                kwargs = {kw.arg: _literal(kw.value) for kw in node.keywords}
+            except (ValueError, TypeError, SyntaxError):
+                return None
+            if 'sheet_name' not in kwargs:
+                return None
+            out.append((kwargs.pop('sheet_name'), kwargs))
+    return out
+
+
+def _version(name):
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def inputs(name):
+    """Everything figure `name` depends on, as a JSON-able dict."""
+    import workbook
+    code = modules(reproduce.figures[name])
+    used = sheets(code[os.path.join(ROOT, reproduce.figures[name])])
+    if used is None:
+        data = {os.path.basename(workbook.WORKBOOK): workbook._sha256(workbook.WORKBOOK)}
+    else:
+        data = {f'{sheet} {json.dumps(workbook._options(kw))}': workbook.digest(sheet, **kw) for sheet, kw in used}
+    return {
+        'code': {os.path.relpath(path, ROOT): _sha256(source) for path, source in sorted(code.items())},
+        'sheets': data,
+        'libraries': {lib: _version(lib) for lib in libraries},
+    }
+
+
+def key(deps):
+    return _sha256(json.dumps(deps, sort_keys=True).encode('utf-8'))
+
+
+def _load():
+    try:
+        with open(STAMPS) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def plan(names=None, force=False):
+    """{figure: reason} for every figure that has to be rebuilt, plus the current inputs."""
+    names = list(reproduce.figures) if not names else names
+    stamps = _load()
+    current, dirty = {}, {}
+    for name in names:
+        current[name] = new = inputs(name)
+        missing = [f for f in outputs[name] if not os.path.exists(f)]
+        if force:
+            dirty[name] = 'forced'
+        elif name not in stamps:
+            dirty[name] = 'never built'
+        elif missing:
+            dirty[name] = f'missing {missing[0]}'
+        elif stamps[name]['key'] != key(new):
+            old = stamps[name]['inputs']
+            changed = [f'{group}: {item}' for group in new for item in new[group]
+                       if old.get(group, {}).get(item) != new[group][item]]
+            changed += [f'{group}: {item}' for group in old for item in old[group] if item not in new.get(group, {})]
+            dirty[name] = ', '.join(changed) or 'inputs changed'
+    return dirty, current
+
+
+def build(names=None, workers=1, force=False, dry_run=False, out=sys.stdout):
+    dirty, current = plan(names, force)
+    for name in current:
+        print(f"{name:<10}{'rebuild (' + dirty[name] + ')' if name in dirty else 'up to date'}", file=out)
+    if dry_run or not dirty:
+        return {}
+
+    start = time.time()
+    if workers > 1:
+        timings = reproduce.run_parallel(list(dirty), workers=workers, out=out)
+    else:
+        timings = reproduce.run(list(dirty), headless=True, out=out)
+
+    # A figure is stamped only if all of its outputs were written by this build
+    stamps = _load()
+    for name in dirty:
+        if all(os.path.exists(f) and os.path.getmtime(f) >= start - 1 for f in outputs[name]):
+            stamps[name] = {'key': key(current[name]), 'inputs': current[name]}
+        else:
+            stamps.pop(name, None)
+    os.makedirs(os.path.dirname(STAMPS) or '.', exist_ok=True)
+    with open(STAMPS, 'w') as f:
+        json.dump(stamps, f, indent=1)
+    return timings
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('figures', nargs='*', help=f'figures to consider (default: all of {", ".join(reproduce.figures)})')
+    parser.add_argument('--workers', type=int, default=1, help='render on this many processes')
+    parser.add_argument('--force', action='store_true', help='rebuild even if nothing changed')
+    parser.add_argument('--dry-run', action='store_true', help='only report what would be rebuilt')
+    args = parser.parse_args()
+
+    timings = build(args.figures, workers=args.workers, force=args.force, dry_run=args.dry_run)
+    if timings:
+        reproduce.report(timings)
+    sys.exit(any(s is None for s in timings.values()))
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Anas Abuzayed © 2025
+https://github.com/AnasAbuzayed/H2_CCGT
+
+Description:
+Carbon-price sweep of the single-fuel marginal cost of electricity (figure 2,
+Single-Fuel-Marginal-Cost.py). The marginal cost of every route is linear in
+the carbon price p:
+
+    MC(p) = fuel + p * emissions,   emissions = CO2 intensity / efficiency
+
+with the fuel cost and CO2 intensity of the 'Single Fuel_New' sheet (only the
+natural gas route emits; it is stacked there at a few EU ETS prices). The
+whole price vector is evaluated in one broadcast, and the break-even carbon
+price of two routes follows in closed form:
+
+    p* = (fuel_b - fuel_a) / (emissions_a - emissions_b)
+
+Usage:
+    python carbon_price.py
+    python carbon_price.py --by delivery --max-price 500
+
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+import cost_kernel
+import workbook
+
+SHEET = 'Single Fuel_New'
+
+components = ['Production', 'Synthesis', 'Shipping', 'Delivery', 'Regasification', 'Cracking']
+
+prices = np.arange(0, 1001.0)  # EUR/tCO2
+
+
+def _parameter(df, label):
+    # Value next to a label in the parameter block beside the route table
+    for k in range(df.shape[1] - 1):
+        hit = df.index[df.iloc[:, k] == label]
+        if len(hit):
+            return float(df.iloc[hit[0], k + 1])
+    raise KeyError(f"'{label}' not found on sheet '{SHEET}'")
+
+
+def routes(by='route', efficiency=cost_kernel.efficiency, intensity=None, df=None):
+    """
+    Fuel cost (EUR/MWh_el, without carbon) and emissions (tCO2/MWh_el) of every
+    route of the sheet.
+
+    by:         'route' (mean over delivery types, as figure 2 shows them) or
+                'delivery' (one row per route, storage and delivery type)
+    intensity:  {route: tCO2/MWh_th} overriding the sheet (default: the sheet's
+                CO2 intensity for the routes it charges carbon on, 0 otherwise)
+    """
+    if df is None:
+        df = workbook.read_excel(sheet_name=SHEET)
+    rows = df[df['Route'].notna() & pd.to_numeric(df['Production'], errors='coerce').notna()]
+    fuel = rows[components].astype(float).sum(axis=1) / efficiency
+    charged = rows.groupby('Route')['Carbon'].transform(lambda c: (c.astype(float) > 0).any())
+    co2 = np.where(charged, _parameter(df, 'CO2 Intensity'), 0.0)
+    if intensity:
+        co2 = np.where(rows['Route'].isin(intensity), rows['Route'].map(intensity), co2)
+    table = pd.DataFrame({'Route': rows['Route'], 'Description': rows['Description'],
+                          'Delivery type': rows['Delivery type'],
+                          'fuel': fuel, 'emissions': co2 / efficiency})
+    if by == 'route':
+        return table.groupby('Route', sort=False)[['fuel', 'emissions']].mean()
+    if by == 'delivery':
+        # The carbon-price variants of a route are the same route without carbon
+        table = table.drop_duplicates(['Route', 'Description', 'Delivery type'])
+        return table.set_index(['Route', 'Description', 'Delivery type'])[['fuel', 'emissions']]
+    raise ValueError(f"Unknown grouping '{by}', expected 'route' or 'delivery'")
+
+
+def marginal_cost(fuel, emissions, prices=prices):
+    """
+    MC of every route at every carbon price: fuel and emissions (..., routes)
+    against prices (P,) give (..., P, routes).
+    """
+    fuel, emissions = np.asarray(fuel, dtype=float), np.asarray(emissions, dtype=float)
+    return fuel[..., None, :] + np.asarray(prices, dtype=float)[:, None] * emissions[..., None, :]
+
+
+def sweep(prices=prices, table=None):
+    """Marginal cost of every route (columns) at every carbon price (rows)."""
+    table = routes() if table is None else table
+    mc = marginal_cost(table['fuel'].values, table['emissions'].values, prices)
+    return pd.DataFrame(mc, index=pd.Index(prices, name='Carbon price (EUR/tCO2)'), columns=table.index)
+
+
+def break_even(fuel, emissions):
+    """
+    Pairwise break-even carbon prices: fuel and emissions (..., routes) give
+    (..., routes, routes) with [i, j] the price at which route i costs as much
+    as route j. NaN where the two routes emit the same (they never cross).
+    """
+    fuel, emissions = np.asarray(fuel, dtype=float), np.asarray(emissions, dtype=float)
+    dfuel = fuel[..., None, :] - fuel[..., :, None]
+    demissions = emissions[..., :, None] - emissions[..., None, :]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(demissions != 0, dfuel / np.where(demissions != 0, demissions, 1), np.nan)
+
+
+def break_even_table(table=None, prices=None):
+    """
+    One row per pair of routes: the break-even carbon price and which route is
+    cheaper below and above it. prices=(low, high) keeps the pairs that cross
+    within that range.
+    """
+    table = routes() if table is None else table
+    fuel, emissions = table['fuel'].values, table['emissions'].values
+    p = break_even(fuel, emissions)
+    i, j = np.triu_indices(len(table), 1)
+    names = np.array(table.index.map(lambda n: ' - '.join(n) if isinstance(n, tuple) else n), dtype=object)
+    # Below p* the route emitting more is cheaper, above it the one emitting less
+    dirty = np.where(emissions[i] > emissions[j], i, j)
+    clean = np.where(emissions[i] > emissions[j], j, i)
+    out = pd.DataFrame({'route_a': names[i], 'route_b': names[j], 'break_even': p[i, j],
+                        'cheaper_below': names[dirty], 'cheaper_above': names[clean]})
+    # Routes that never cross: the cheaper one wins at every price
+    same = np.isnan(p[i, j])
+    cheaper = names[np.where(fuel[i] <= fuel[j], i, j)]
+    out.loc[same, ['cheaper_below', 'cheaper_above']] = np.c_[cheaper[same], cheaper[same]]
+    if prices is not None:
+        out = out[(out['break_even'] >= prices[0]) & (out['break_even'] <= prices[1])]
+    return out.sort_values('break_even', na_position='last').reset_index(drop=True)
+
+
+def cheapest(prices=prices, table=None):
+    """Cheapest route at every carbon price."""
+    mc = sweep(prices, table)
+    return mc.idxmin(axis=1).rename('cheapest')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--by', choices=['route', 'delivery'], default='route', help='route grouping')
+    parser.add_argument('--max-price', type=float, default=prices[-1], help='upper end of the carbon price range (EUR/tCO2)')
+    args = parser.parse_args()
+
+    table = routes(args.by)
+    print(table.to_string())
+    print()
+    print(break_even_table(table, prices=(0, args.max_price)).to_string(index=False))
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Anas Abuzayed © 2025
+https://github.com/AnasAbuzayed/H2_CCGT
+
+Description:
+Shared cost kernels (LCOE of firing and LCOS of fuel storage) used by the
+figure scripts. The discounting sums are evaluated with the closed-form
+annuity factor and every function accepts NumPy arrays as well as scalars.
+
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+# Constants (defaults used throughout the paper)
+efficiency = 0.63
+capex = 1039.34 # EUR/kW CCGT
+capacity = 38e6  # 38 GW
+FOM = 14  # EUR/kW/year
+VOM = 3  # EUR/MWh
+fcr_p = 0.08083586
+fcr_s = 0.102880385
+WACC = 0.0581
+storage_lifetime = 20
+CCGT_lifetime = 35
+FOM_storage = 0.02
+
+# Single fuels of the sensitivity and uncertainty analyses (Sensitivity.py, monte_carlo.py):
+# storage CAPEX (EUR/MWh_fuel), retrofit cost (share of CCGT CAPEX) and supply chain (EUR/MWh_fuel)
+store_capex = {"H2-Tank": 1091.02, "H2-Cavern": 321.86, "NH3": 157.64, "CH4": 182.07, "NH3c": 157.64}
+retrofit = {"H2-Tank": 0.0798, "H2-Cavern": 0.0798, "NH3": 0.1134, "CH4": 0, "NH3c": 0.0798}
+supply_chain_components = ['Production', 'Synthesis', 'Shipping', 'Distribution', 'Regasification']
+supply_chain = {
+    "H2-Tank": [49.48, 9.58, 24.26, 22.72, 8.47],
+    "H2-Cavern": [49.48, 9.58, 24.26, 22.72, 8.47],
+    "NH3": [49.48, 34, 9.08, 3.44, 0],
+    "CH4": [97.19, 0, 0, 4.71, 0],
+    "NH3c": [49.48, 34, 9.08, 3.44, 0],
+}
+cracking = 0.2  # NH3c: cracking adds this share of the NH3 supply chain
+
+
+@lru_cache(maxsize=None)
+def _annuity_factor(WACC, lifetime):
+    if WACC == 0:
+        return float(lifetime)
+    return (1 - (1 + WACC) ** -lifetime) / WACC
+
+
+def annuity_factor(WACC, lifetime):
+    """
+    Present value of one unit paid at the end of every year, i.e.
+    sum(1 / (1 + WACC) ** y for y in range(1, lifetime + 1)).
+    Scalars are served from a cache, arrays are evaluated element-wise.
+    """
+    if np.ndim(WACC) == 0 and np.ndim(lifetime) == 0:
+        return _annuity_factor(float(WACC), int(lifetime))
+    WACC = np.asarray(WACC)
+    safe = np.where(WACC == 0, 1.0, WACC)
+    return np.where(WACC == 0, lifetime, (1 - (1 + safe) ** -np.asarray(lifetime)) / safe)
+
+
+def storage_reserve(days, capacity=capacity, efficiency=efficiency):
+    # Fuel to be stored for `days` of full-load operation (MWh_fuel)
+    return (days * capacity * 24 / 1e3) / efficiency
+
+
+# LCOE function
+def lcoe(E, retrofit_pct=0, capex=capex, capacity=capacity, FOM=FOM, VOM=VOM,
+         fcr_p=fcr_p, WACC=WACC, lifetime=CCGT_lifetime):
+    af = annuity_factor(WACC, lifetime)
+    initial = capacity * (capex * (1 + retrofit_pct)) * (1 + fcr_p)
+    money = (FOM * capacity + E * VOM / 1000) * af
+    energy = E * af
+    return (initial + money) / energy * 1000
+
+
+# LCOS function
+def lcos(E, reserve, CAPEX, share=1, FOM_storage=FOM_storage, fcr_s=fcr_s,
+         WACC=WACC, lifetime=storage_lifetime):
+    af = annuity_factor(WACC, lifetime)
+    initial = reserve * share * CAPEX * (1 + fcr_s)
+    money = FOM_storage * initial * af
+    energy = E * af
+    return (initial + money) / energy * 1000
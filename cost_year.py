@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Anas Abuzayed © 2025
+https://github.com/AnasAbuzayed/H2_CCGT
+
+Description:
+Currency-year normalisation of cost inputs, backed by the Inflation_Adjustment
+sheet of Calculations.xlsx. The consumer price indices (CPI EU, CPI USD) and
+the USD/EUR rate are loaded once into arrays indexed by currency and year;
+`convert` then re-bases whole arrays of (value, currency, year) to euros of a
+target year in one vectorised call.
+
+The cost constants of the figure scripts (capex = 1039.34, H2_capex =
+1091.02, the supply-chain components 49.48, 9.58, 24.26 ...) are the row-20
+values of that sheet, i.e. 2025 euros. `sources()` lists each of them with the
+value, year and price index it was reported in, and `costs(year)` re-bases all
+of them to another year.
+
+Several row-20 formulas look the value up in rows 10-19 but the index in rows
+2-19, so they divide by the index of a year 8 years before the reported one
+(e.g. CCGT Cost: 775 EUR of 2019 gives 1039.34 instead of 940.07). `sources()`
+records that year as `index_year`; costs(..., sheet=True) reproduces the
+sheet (and the constants of the scripts), the default re-bases from the
+reported year.
+
+Usage:
+    cost_year.convert([775, 45.317], 'EUR', [2019, 2015], 2025)
+    cost_year.costs(2025, sheet=True)['CCGT Cost']  # 1039.34
+
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+import workbook
+
+TARGET_YEAR = 2025
+SHEET = 'Inflation_Adjustment'
+
+# Currency -> price-index column of the sheet
+currencies = {'EUR': 'CPI EU', 'USD': 'CPI USD'}
+
+
+@lru_cache(maxsize=None)
+def table(path=workbook.WORKBOOK):
+    """
+    Years (n,), price index per currency (len(currencies), n) and the rate of
+    each currency to EUR (len(currencies),), as read from the sheet.
+    """
+    df = workbook.read_excel(sheet_name=SHEET, path=path)
+    year = pd.to_numeric(df['year'], errors='coerce')
+    # The series is the leading block of rows (the sheet has scratch values further down)
+    valid = year.notna() & pd.to_numeric(df['CPI EU'], errors='coerce').notna()
+    rows = valid & valid.cumprod().astype(bool)
+    years = year[rows].astype(int).to_numpy()
+    if np.any(np.diff(years) != 1):
+        raise ValueError(f"{SHEET}: years must be consecutive, got {years}")
+    index = np.vstack([pd.to_numeric(df.loc[rows, col]).to_numpy(dtype=float)
+                       for col in currencies.values()])
+    usd = df.loc[df['year'] == 'USD_to_Eur', df.columns[1]]
+    fx = np.array([1.0 if c == 'EUR' else float(usd.iloc[0]) for c in currencies])
+    for a in (years, index, fx):
+        a.flags.writeable = False
+    return years, index, fx
+
+
+def _codes(currency):
+    # Position of every currency name in `currencies`
+    names = list(currencies)
+    currency = np.asarray(currency)
+    unique, inverse = np.unique(currency, return_inverse=True)
+    unknown = [c for c in unique if c not in currencies]
+    if unknown:
+        raise ValueError(f"Unknown currency {unknown}, expected one of {names}")
+    return np.array([names.index(c) for c in unique])[inverse].reshape(currency.shape)
+
+
+def _positions(year, years):
+    year = np.asarray(year)
+    bad = (year < years[0]) | (year > years[-1]) | (year != np.round(year))
+    if np.any(bad):
+        raise ValueError(f"{SHEET} has no year {sorted(set(np.atleast_1d(year[bad]).tolist()))}, "
+                         f"expected whole years within {years[0]}-{years[-1]}")
+    return year.astype(int) - years[0]
+
+
+def convert(values, currency='EUR', year=TARGET_YEAR, target_year=TARGET_YEAR, index=None,
+            path=workbook.WORKBOOK):
+    """
+    Re-base `values` reported in `currency` of `year` to EUR of `target_year`.
+
+    currency, year, target_year and index broadcast against values, so every
+    value may carry its own currency and year, and a column of values can be
+    re-based to a row of target years at once.
+    index: currency whose price index inflates the value (default: `currency`;
+           the sheet inflates some converted USD costs with the US index)
+    """
+    years, cpi, fx = table(path)
+    cur = _codes(currency)
+    idx = cur if index is None else _codes(index)
+    y, t = _positions(year, years), _positions(target_year, years)
+    return np.asarray(values, dtype=float) * fx[cur] * cpi[idx, t] / cpi[idx, y]
+
+
+@lru_cache(maxsize=4096)
+def factor(currency='EUR', year=TARGET_YEAR, target_year=TARGET_YEAR, index=None, path=workbook.WORKBOOK):
+    """Conversion factor of one (currency, year) pair, cached for repeated scalar lookups."""
+    return float(convert(1.0, currency, year, target_year, index, path))
+
+
+@lru_cache(maxsize=None)
+def _sources(path):
+    df = workbook.read_excel(sheet_name=SHEET, path=path)
+    years, cpi, fx = table(path)
+    n = len(years)
+    head = df.columns[0]
+    # The reported costs are listed under the 'Value' header, one per row
+    start = df.index[df.iloc[:, 1] == 'Value'][0] + 1
+    items = df.loc[start:].dropna(subset=[head])
+    items = items[items[head].isin(df.columns)]
+    out = []
+    for _, row in items.iterrows():
+        name = row[head]
+        column = pd.to_numeric(df[name].iloc[:n - 1], errors='coerce')
+        base = column.last_valid_index()
+        target = float(df[name].iloc[n - 1])
+        # The price index and index year that reproduce the sheet's last-year value
+        error = np.abs(column[base] * cpi[:, -1:] / cpi[:, :-1] - target)
+        k, j = np.unravel_index(np.argmin(error), error.shape)
+        out.append({'item': name, 'value': float(column[base]), 'unit': row.iloc[2],
+                    'year': int(years[base]), 'index': list(currencies)[k],
+                    'index_year': int(years[j]), 'source': row.iloc[3]})
+    return pd.DataFrame(out).set_index('item')
+
+
+def sources(path=workbook.WORKBOOK):
+    """Reported value, unit, year and price index of every cost on the sheet."""
+    return _sources(path).copy()
+
+
+def costs(target_year=TARGET_YEAR, sheet=False, path=workbook.WORKBOOK):
+    """
+    Every cost of the sheet in EUR of `target_year` (a Series), or of every
+    year of an array of target years (a DataFrame, one column per year).
+    sheet: inflate from `index_year` as the sheet does, instead of the reported year
+    """
+    s = _sources(path)
+    year = s['index_year' if sheet else 'year'].to_numpy()
+    if np.ndim(target_year) == 0:
+        return pd.Series(convert(s['value'], 'EUR', year, target_year, s['index'], path),
+                         index=s.index, name=target_year)
+    target_year = np.asarray(target_year)
+    values = convert(s['value'].to_numpy()[:, None], 'EUR', year[:, None],
+                     target_year[None, :], s['index'].to_numpy()[:, None], path)
+    return pd.DataFrame(values, index=s.index, columns=target_year)
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Anas Abuzayed © 2025
+https://github.com/AnasAbuzayed/H2_CCGT
+
+Description:
+Batched export of plotly figures through one warm kaleido process.
+write_image takes the same arguments as fig.write_image. Outside a batch it
+exports immediately. Inside `batch()` the figures are queued and written
+together at the end of the block, so the exporter (Chromium) starts once
+for all of them. `variants` builds the specs for several formats and
+scales of one figure.
+
+"""
+
+import contextlib
+import os
+
+import telemetry
+
+_queue = None  # list of pending specs while a batch is open
+
+
+def spec(fig, file, format=None, scale=None, width=None, height=None):
+    # Figures are stored as dicts so later changes to `fig` do not leak into the export
+    return {'fig': fig.to_dict() if hasattr(fig, 'to_dict') else fig, 'file': str(file),
+            'format': format, 'scale': scale, 'width': width, 'height': height}
+
+
+def variants(fig, stem, formats=('png', 'pdf', 'svg'), scales=(2,), width=None, height=None):
+    """
+    Specs for every format x scale of one figure. Raster files get an @{scale}x
+    suffix when more than one scale is requested; vector formats are written once.
+    """
+    out = []
+    for fmt in formats:
+        vector = fmt in ('pdf', 'svg', 'eps')
+        for scale in (scales[:1] if vector else scales):
+            suffix = f'@{scale:g}x' if len(scales) > 1 and not vector else ''
+            out.append(spec(fig, f'{stem}{suffix}.{fmt}', format=fmt, scale=scale, width=width, height=height))
+    return out
+
+
+def _chrome():
+    # kaleido >= 1 drives a Chrome install; without one its sync server hangs instead of failing
+    try:
+        from choreographer.browsers.chromium import Chromium
+        return Chromium.find_browser(skip_local=False)
+    except Exception:
+        return None
+
+
+@contextlib.contextmanager
+def server():
+    """Keep one kaleido exporter alive for the duration of the block."""
+    started = False
+    try:
+        import kaleido
+        if hasattr(kaleido, 'start_sync_server') and _chrome():
+            kaleido.start_sync_server(silence_warnings=True)
+            started = True
+    except ImportError:
+        pass
+    try:
+        yield
+    finally:
+        if started:
+            kaleido.stop_sync_server(silence_warnings=True)
+
+
+def export(specs):
+    """Write a list of specs in a single exporter call."""
+    if not specs:
+        return
+    import plotly.io as pio
+    if hasattr(pio, 'write_images'):
+        with telemetry.stage(f'export {len(specs)} image(s)'):
+            pio.write_images(fig=[s['fig'] for s in specs], file=[s['file'] for s in specs],
+                             format=[s['format'] for s in specs], scale=[s['scale'] for s in specs],
+                             width=[s['width'] for s in specs], height=[s['height'] for s in specs])
+    else:
+        # kaleido 0.2 already keeps its process alive between calls
+        for s in specs:
+            with telemetry.stage(f"write_image {os.path.basename(s['file'])}"):
+                pio.write_image(**s)
+
+
+def write_image(fig, file, format=None, scale=None, width=None, height=None):
+    with telemetry.stage(f'write_image {os.path.splitext(os.path.basename(str(file)))[0]}'):
+        if _queue is not None:
+            _queue.append(spec(fig, file, format, scale, width, height))
+        else:
+            export([spec(fig, file, format, scale, width, height)])
+
+
+@contextlib.contextmanager
+def collect():
+    """Queue write_image calls made in the block into the yielded list, without exporting."""
+    global _queue
+    previous, _queue = _queue, []
+    try:
+        yield _queue
+    finally:
+        _queue = previous
+
+
+@contextlib.contextmanager
+def batch():
+    """
+    Queue write_image calls made in the block and export them together at the
+    end. Inside an open batch or collect() (reproduce.py) the calls join the
+    outer queue instead, so a script exports the same way on its own and
+    through reproduce.py.
+    """
+    if _queue is not None:
+        yield _queue
+        return
+    with collect() as specs:
+        yield specs
+    with server():
+        export(specs)
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Anas Abuzayed © 2025
+https://github.com/AnasAbuzayed/H2_CCGT
+
+Description:
+LCOE surface over technology x full-load hours x reserve days, built in one
+broadcast. Any FLH resolution (down to hourly, 1-8760) and fractional
+reserve days are supported. `surface_grids` evaluates grids too large for
+memory tile by tile (see tiled_grid.py).
+
+`crossover_flh` and `crossover_days` locate where two technologies swap rank
+by bracketed root finding on the cost kernels, for all pairs and all points
+of the other axis at once. With the paper's kernels every cost is
+(a + b * days) / FLH + VOM, so FLH cancels in the difference of two
+technologies: the crossovers are vertical lines at days = -da / db, returned
+by crossover_days, while crossover_flh finds no crossing (NaN). Kernels with
+technology-specific FLH terms (e.g. VOM) give genuine FLH(days) curves.
+
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+import cost_kernel
+import tiled_grid
+
+
+def surface(techs, capex, retrofit_pct, FLH, days, lcoe=cost_kernel.lcoe, lcos=cost_kernel.lcos,
+            capacity=cost_kernel.capacity, efficiency=cost_kernel.efficiency):
+    """
+    Labelled (tech, FLH, days) arrays of the firing, storage and total LCOE.
+
+    capex:        storage CAPEX per tech (EUR/MWh_fuel)
+    retrofit_pct: retrofit cost share per tech
+    lcoe, lcos:   vectorized lcoe(E, retrofit_pct) and lcos(E, reserve, CAPEX)
+    """
+    FLH = np.asarray(FLH, dtype=float)
+    days = np.asarray(days, dtype=float)
+    E = FLH[None, :, None] * capacity                                   # MWh/year
+    reserve = cost_kernel.storage_reserve(days[None, None, :], capacity, efficiency)
+    firing = lcoe(E, np.asarray(retrofit_pct, dtype=float)[:, None, None])
+    storage = lcos(E, reserve, np.asarray(capex, dtype=float)[:, None, None])
+    shape = (len(techs), len(FLH), len(days))
+    return {
+        'tech': list(techs), 'FLH': FLH, 'days': days,
+        'value': np.broadcast_to(firing + storage, shape),
+        'firing': np.broadcast_to(firing, shape),
+        'storage': np.broadcast_to(storage, shape),
+    }
+
+
+def to_frame(surf):
+    # Long DataFrame in (tech, FLH, days) order, as built by the original loop
+    T, N, D = surf['value'].shape
+    return pd.DataFrame({
+        'FLH': np.tile(np.repeat(surf['FLH'], D), T),
+        'days': np.tile(surf['days'], T * N),
+        'tech': pd.Categorical.from_codes(np.repeat(np.arange(T), N * D), surf['tech']),
+        'value': surf['value'].ravel(),
+        'firing': surf['firing'].ravel(),
+        'storage': surf['storage'].ravel(),
+    })
+
+
+def flh_surface(techs, capex, retrofit_pct, FLH, days, **kwargs):
+    return to_frame(surface(techs, capex, retrofit_pct, FLH, days, **kwargs))
+
+
+def bracket_roots(f, lo, hi, shape, scan=16, xtol=1e-10, maxiter=100):
+    """
+    First root of f on [lo, hi] for a whole batch of problems at once.
+
+    f:      f(x) for x of `shape` (one abscissa per problem), returning `shape`
+    lo, hi: bracket (scalars or broadcastable to `shape`); a geometric scan of
+            `scan` points locates the first sign change, which is refined by
+            the Illinois (modified regula falsi) method to a relative `xtol`
+
+    Returns the roots, NaN where f does not change sign on [lo, hi].
+    """
+    lo = np.broadcast_to(np.asarray(lo, dtype=float), shape)
+    hi = np.broadcast_to(np.asarray(hi, dtype=float), shape)
+    t = np.linspace(0, 1, scan)
+    if np.all(lo > 0):
+        points = [lo * (hi / lo) ** s for s in t]
+    else:
+        points = [lo + (hi - lo) * s for s in t]
+    a, fa = points[0], f(points[0])
+    found = np.zeros(shape, dtype=bool)
+    x0, x1, f0, f1 = a.copy(), a.copy(), fa.copy(), fa.copy()
+    for b in points[1:]:
+        fb = f(b)
+        # A sign change; touching zero at the start of the interval is not a crossing
+        hit = ~found & ((np.sign(fa) * np.sign(fb) < 0) | ((fb == 0) & (fa != 0)))
+        x0[hit], f0[hit], x1[hit], f1[hit] = a[hit], fa[hit], b[hit], fb[hit]
+        found |= hit
+        a, fa = b, fb
+
+    root = x1.copy()
+    active = found & (f1 != 0)
+    side = np.zeros(shape)
+    for _ in range(maxiter):
+        if not active.any():
+            break
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x = np.where(active, x1 - f1 * (x1 - x0) / (f1 - f0), root)
+        fx = f(x)
+        root = np.where(active, x, root)
+        converged = active & ((fx == 0) | (np.abs(x1 - x0) <= xtol * np.abs(x)))
+        # Keep the bracket; halve the value of an end point retained twice in a row
+        left = active & (np.sign(fx) == np.sign(f0))
+        right = active & ~left
+        x0, f0 = np.where(left, x, x0), np.where(left, fx, f0)
+        x1, f1 = np.where(right, x, x1), np.where(right, fx, f1)
+        f1 = np.where(left & (side == -1), f1 / 2, f1)
+        f0 = np.where(right & (side == 1), f0 / 2, f0)
+        side = np.where(left, -1, np.where(right, 1, side))
+        active &= ~converged
+        # Bracket shrunk below xtol without an exact zero
+        active &= np.abs(x1 - x0) > xtol * np.abs(root)
+    return np.where(found, root, np.nan)
+
+
+def _pairs(techs, pairs):
+    if pairs is None:
+        i, j = np.triu_indices(len(techs), 1)
+        return i, j
+    index = {t: k for k, t in enumerate(techs)}
+    return np.array([index[a] for a, _ in pairs]), np.array([index[b] for _, b in pairs])
+
+
+def _crossovers(techs, capex, retrofit_pct, points, bracket, solve, pairs, lcoe, lcos, capacity, efficiency,
+                **kwargs):
+    # Roots in `solve` ('FLH' or 'days') for every pair (rows) x point of the other axis (columns)
+    i, j = _pairs(techs, pairs)
+    capex = np.asarray(capex, dtype=float)
+    retrofit_pct = np.asarray(retrofit_pct, dtype=float)
+    points = np.asarray(points, dtype=float)
+    shape = (len(i), len(points))
+
+    def cost(k, FLH, days):
+        E = FLH * capacity
+        reserve = cost_kernel.storage_reserve(days, capacity, efficiency)
+        return lcoe(E, retrofit_pct[k][:, None]) + lcos(E, reserve, capex[k][:, None])
+
+    def f(x):
+        FLH, days = (x, points[None, :]) if solve == 'FLH' else (points[None, :], x)
+        return cost(i, FLH, days) - cost(j, FLH, days)
+
+    roots = bracket_roots(f, bracket[0], bracket[1], shape, **kwargs)
+    # The cheaper technology below the crossing (at the low end of the bracket, or the high end
+    # where the two start out equal)
+    low = f(np.full(shape, float(bracket[0])))
+    low = np.where(low == 0, f(np.full(shape, float(bracket[1]))), low)
+    other = 'days' if solve == 'FLH' else 'FLH'
+    techs = np.asarray(list(techs), dtype=object)
+    return pd.DataFrame({
+        'tech_a': np.repeat(techs[i], len(points)),
+        'tech_b': np.repeat(techs[j], len(points)),
+        other: np.tile(points, len(i)),
+        solve: roots.ravel(),
+        'cheaper_below': np.where(low <= 0, techs[i][:, None], techs[j][:, None]).ravel(),
+    })
+
+
+def crossover_flh(techs, capex, retrofit_pct, days, FLH=(1, 8760), pairs=None, lcoe=cost_kernel.lcoe,
+                  lcos=cost_kernel.lcos, capacity=cost_kernel.capacity, efficiency=cost_kernel.efficiency,
+                  **kwargs):
+    """
+    FLH at which each pair of techs costs the same, as a function of reserve days.
+
+    days:   reserve days to solve at
+    FLH:    (low, high) FLH bracket searched
+    pairs:  (tech_a, tech_b) pairs (default: every pair)
+
+    Returns one row per pair and day: tech_a, tech_b, days, FLH (NaN without a
+    crossing in the bracket) and the tech that is cheaper below that FLH.
+    """
+    return _crossovers(techs, capex, retrofit_pct, days, FLH, 'FLH', pairs, lcoe, lcos, capacity,
+                       efficiency, **kwargs)
+
+
+def crossover_days(techs, capex, retrofit_pct, FLH, days=(0, 21), pairs=None, lcoe=cost_kernel.lcoe,
+                   lcos=cost_kernel.lcos, capacity=cost_kernel.capacity, efficiency=cost_kernel.efficiency,
+                   **kwargs):
+    """
+    Reserve days at which each pair of techs costs the same, as a function of
+    FLH (see crossover_flh); the row's tech is cheaper below those days.
+    """
+    return _crossovers(techs, capex, retrofit_pct, FLH, days, 'days', pairs, lcoe, lcos, capacity,
+                       efficiency, **kwargs)
+
+
+def surface_rows(capex, retrofit_pct, FLH, days, part='value', lcoe=cost_kernel.lcoe, lcos=cost_kernel.lcos,
+                 capacity=cost_kernel.capacity, efficiency=cost_kernel.efficiency):
+    """Tile function for tiled_grid.evaluate: FLH rows r0:r1 x all days of one tech."""
+    FLH = np.asarray(FLH, dtype=float)
+    reserve = cost_kernel.storage_reserve(np.asarray(days, dtype=float)[None, :], capacity, efficiency)
+
+    def rows(r0, r1):
+        E = FLH[r0:r1, None] * capacity
+        firing = lcoe(E, retrofit_pct)
+        storage = lcos(E, reserve, capex)
+        values = {'value': firing + storage, 'firing': firing, 'storage': storage}[part]
+        return np.broadcast_to(values, (r1 - r0, reserve.shape[1]))
+    return rows
+
+
+def surface_grids(techs, capex, retrofit_pct, FLH, days, folder, part='value', reducers=None,
+                  dtype=np.float32, tile_rows=None, **kwargs):
+    """
+    Out-of-core surface: the (FLH, days) grid of every tech is evaluated tile by
+    tile into {folder}/{tech}.npy, so hourly FLH x fine reserve steps fit in
+    constant memory.
+
+    reducers: reducers(tech) returning extra tiled_grid reducers to stream each grid through
+
+    Returns one row per tech: tech, file, minimum and its FLH and days.
+    """
+    os.makedirs(folder, exist_ok=True)
+    FLH = np.asarray(FLH, dtype=float)
+    days = np.asarray(days, dtype=float)
+    summary = []
+    for tech, c, pct in zip(techs, capex, retrofit_pct):
+        path = os.path.join(folder, f'{tech}.npy')
+        low = tiled_grid.Minimum()
+        extra = list(reducers(tech)) if reducers else []
+        tiled_grid.evaluate(surface_rows(c, pct, FLH, days, part, **kwargs), (len(FLH), len(days)), path,
+                            dtype=dtype, tile_rows=tile_rows, reducers=[low] + extra)
+        i, j = low.index
+        summary.append({'tech': tech, 'file': path, 'min': low.value, 'FLH': FLH[i], 'days': days[j]})
+    return pd.DataFrame(summary)
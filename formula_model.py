@@ -0,0 +1,647 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Anas Abuzayed © 2025
+https://github.com/AnasAbuzayed/H2_CCGT
+
+Description:
+Python recalculation of the Calculations.xlsx formula model, without Excel.
+Every formula of the workbook is parsed once and compiled to Python closures
+(the SUM, SUMPRODUCT, OFFSET and LOOKUP functions and the array formulas of
+Inflation_Adjustment row 20 are supported). Evaluation is per cell: ranges
+are NumPy object arrays and operators apply to them element by element in
+Python (np.frompyfunc), so blanks, text and error values behave as in Excel;
+it is not vectorised float arithmetic. The cells each formula actually reads
+are recorded while it is evaluated, which gives the exact dependency graph,
+OFFSET ranges included. Changing an input recalculates only the cells
+downstream of it.
+
+`Model.read_excel` returns a sheet in the same shape as pd.read_excel (and
+workbook.read_excel), so the figure scripts can read what-if results.
+
+Usage:
+    model = Model()
+    model.set('Inputs!B26', 0.03)
+    df = model.read_excel('UK', index_col=0, usecols=range(7), nrows=19)
+
+    python formula_model.py --check
+    python formula_model.py --set Inputs!B26=0.03 --sheet UK
+
+"""
+
+import argparse
+import re
+import sys
+from collections import defaultdict
+from graphlib import TopologicalSorter
+
+import numpy as np
+import pandas as pd
+
+import workbook
+
+
+class XLError(str):
+    """Excel error value (#DIV/0!, #VALUE!, #N/A, ...)."""
+
+
+class FormulaError(ValueError):
+    """Formula that cannot be compiled (syntax or unsupported function), with its cell."""
+
+
+DIV0, VALUE, NA, REF = XLError('#DIV/0!'), XLError('#VALUE!'), XLError('#N/A'), XLError('#REF!')
+
+
+# ---------------------------------------------------------------- references
+
+def column_index(letters):
+    n = 0
+    for ch in letters.upper():
+        n = n * 26 + ord(ch) - 64
+    return n
+
+
+def column_letters(n):
+    out = ''
+    while n:
+        n, r = divmod(n - 1, 26)
+        out = chr(65 + r) + out
+    return out
+
+
+_cell = re.compile(r"^(?:(?:'((?:[^']|'')+)'|([^'!]+))!)?\$?([A-Za-z]{1,3})\$?(\d+)$")
+
+
+def parse_ref(text, sheet=None):
+    """('Sheet', row, col) of a reference such as 'Inputs!$B$26' or 'B26'."""
+    m = _cell.match(text.strip())
+    if not m:
+        raise ValueError(f"Not a cell reference: {text!r}")
+    quoted, plain, col, row = m.groups()
+    name = quoted.replace("''", "'") if quoted else plain or sheet
+    return name, int(row), column_index(col)
+
+
+class Ref:
+    """Rectangular range r1:r2 x c1:c2 (inclusive) of one sheet."""
+
+    __slots__ = ('sheet', 'r1', 'c1', 'r2', 'c2')
+
+    def __init__(self, sheet, r1, c1, r2=None, c2=None):
+        self.sheet, self.r1, self.c1 = sheet, r1, c1
+        self.r2 = r1 if r2 is None else r2
+        self.c2 = c1 if c2 is None else c2
+
+    def cells(self):
+        return [(self.sheet, r, c) for r in range(self.r1, self.r2 + 1) for c in range(self.c1, self.c2 + 1)]
+
+    @property
+    def shape(self):
+        return self.r2 - self.r1 + 1, self.c2 - self.c1 + 1
+
+
+# ----------------------------------------------------------------- tokenizer
+
+_tokens = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<text>"(?:[^"]|"")*")
+  | (?P<error>\#(?:DIV/0!|VALUE!|N/A|REF!|NAME\?|NUM!|NULL!))
+  | (?P<func>[A-Za-z][A-Za-z0-9._]*\()
+  | (?P<ref>(?:(?:'(?:[^']|'')+'|[A-Za-z_][A-Za-z0-9_.]*)!)?\$?[A-Za-z]{1,3}\$?\d+(?![A-Za-z0-9_(]))
+  | (?P<bool>(?:TRUE|FALSE)(?![A-Za-z0-9_(]))
+  | (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<op><>|<=|>=|[-+*/^&%:=<>(),])
+""", re.VERBOSE)
+
+
+def tokenize(formula):
+    pos, out = 0, []
+    while pos < len(formula):
+        m = _tokens.match(formula, pos)
+        if not m:
+            raise ValueError(f"Cannot parse {formula!r} at {formula[pos:]!r}")
+        kind = m.lastgroup
+        if kind != 'ws':
+            out.append((kind, m.group()))
+        pos = m.end()
+    return out
+
+
+# -------------------------------------------------------------- scalar logic
+
+def _number(x):
+    # Excel coercion of one value to a number (blank -> 0, TRUE -> 1)
+    if isinstance(x, XLError):
+        return x
+    if x is None:
+        return 0.0
+    if isinstance(x, (bool, np.bool_)):
+        return float(x)
+    if isinstance(x, str):
+        try:
+            return float(x)
+        except ValueError:
+            return VALUE
+    return x
+
+
+def _arith(f):
+    def op(a, b):
+        a, b = _number(a), _number(b)
+        if isinstance(a, XLError):
+            return a
+        if isinstance(b, XLError):
+            return b
+        return f(a, b)
+    return op
+
+
+def _divide(a, b):
+    return DIV0 if b == 0 else a / b
+
+
+def _power(a, b):
+    try:
+        return a ** b
+    except (ZeroDivisionError, OverflowError, ValueError):
+        return XLError('#NUM!')
+
+
+def _rank(x):
+    # Excel ordering: numbers < text < logicals; blank compares as 0 or ""
+    if isinstance(x, (bool, np.bool_)):
+        return 2, bool(x)
+    if isinstance(x, str):
+        return 1, x.lower()
+    return 0, x
+
+
+def _compare(f):
+    def op(a, b):
+        if isinstance(a, XLError):
+            return a
+        if isinstance(b, XLError):
+            return b
+        if a is None:
+            a = '' if isinstance(b, str) else False if isinstance(b, (bool, np.bool_)) else 0
+        if b is None:
+            b = '' if isinstance(a, str) else False if isinstance(a, (bool, np.bool_)) else 0
+        return f(_rank(a), _rank(b))
+    return op
+
+
+def _concat(a, b):
+    for x in (a, b):
+        if isinstance(x, XLError):
+            return x
+    text = lambda x: '' if x is None else ('TRUE' if x else 'FALSE') if isinstance(x, (bool, np.bool_)) \
+        else f'{x:g}' if isinstance(x, float) else str(x)
+    return text(a) + text(b)
+
+
+_infix = {
+    '+': _arith(lambda a, b: a + b), '-': _arith(lambda a, b: a - b),
+    '*': _arith(lambda a, b: a * b), '/': _arith(_divide), '^': _arith(_power),
+    '&': _concat,
+    '=': _compare(lambda a, b: a == b), '<>': _compare(lambda a, b: a != b),
+    '<': _compare(lambda a, b: a < b), '>': _compare(lambda a, b: a > b),
+    '<=': _compare(lambda a, b: a <= b), '>=': _compare(lambda a, b: a >= b),
+}
+# Element-wise versions for array operands
+_ufunc = {name: np.frompyfunc(f, 2, 1) for name, f in _infix.items()}
+
+
+def _apply(name, a, b):
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return _ufunc[name](a, b)
+    return _infix[name](a, b)
+
+
+def _unary(f, a):
+    if isinstance(a, np.ndarray):
+        return np.frompyfunc(lambda x: _unary(f, x), 1, 1)(a)
+    a = _number(a)
+    return a if isinstance(a, XLError) else f(a)
+
+
+# ----------------------------------------------------------------- functions
+
+def _numbers(values, from_ref):
+    # Numbers of an argument: references skip text, logicals and blanks (as Excel does)
+    flat = values.ravel() if isinstance(values, np.ndarray) else [values]
+    out = []
+    for v in flat:
+        if isinstance(v, XLError):
+            raise _Error(v)
+        if v is None or isinstance(v, str) and from_ref:
+            continue
+        if isinstance(v, (bool, np.bool_)) and from_ref:
+            continue
+        v = _number(v)
+        if isinstance(v, XLError):
+            raise _Error(v)
+        out.append(v)
+    return out
+
+
+class _Error(Exception):
+    def __init__(self, value):
+        self.value = value
+
+
+def fn_sum(model, *args):
+    return float(sum(sum(_numbers(model.deref(a), isinstance(a, Ref))) for a in args))
+
+
+def fn_sumproduct(model, *args):
+    arrays = []
+    for a in args:
+        v = np.asarray(model.deref(a), dtype=object)
+        for x in v.ravel():
+            if isinstance(x, XLError):
+                raise _Error(x)
+        numeric = np.frompyfunc(lambda x: float(x) if isinstance(x, (int, float)) and
+                                not isinstance(x, (bool, np.bool_)) else 0.0, 1, 1)(v)
+        arrays.append(numeric.astype(float))
+    if any(a.shape != arrays[0].shape for a in arrays):
+        return VALUE
+    return float(np.sum(np.prod(arrays, axis=0)))
+
+
+def fn_lookup(model, value, lookup, result=None):
+    # Vector form with approximate match: last entry <= value of the same type; errors are skipped
+    value = model.deref(value)
+    keys = np.asarray(model.deref(lookup), dtype=object).ravel()
+    found = None
+    for i, k in enumerate(keys):
+        if isinstance(k, XLError) or k is None or _rank(k)[0] != _rank(value)[0]:
+            continue
+        if _rank(k) <= _rank(value):
+            found = i
+    if found is None:
+        return NA
+    if result is None:
+        return keys[found]
+    if isinstance(result, Ref):
+        h, w = result.shape
+        r, c = (result.r1 + found, result.c1) if w == 1 else (result.r1, result.c1 + found)
+        return model.value((result.sheet, r, c))
+    return np.asarray(result, dtype=object).ravel()[found]
+
+
+def fn_offset(model, ref, rows, cols, height=None, width=None):
+    if not isinstance(ref, Ref):
+        return VALUE
+    rows, cols = _number(model.deref(rows)), _number(model.deref(cols))
+    h, w = ref.shape
+    h = h if height is None else int(_number(model.deref(height)))
+    w = w if width is None else int(_number(model.deref(width)))
+    r1, c1 = ref.r1 + int(rows), ref.c1 + int(cols)
+    if r1 < 1 or c1 < 1 or h < 1 or w < 1:
+        return REF
+    return Ref(ref.sheet, r1, c1, r1 + h - 1, c1 + w - 1)
+
+
+functions = {'SUM': fn_sum, 'SUMPRODUCT': fn_sumproduct, 'LOOKUP': fn_lookup, 'OFFSET': fn_offset}
+
+
+# -------------------------------------------------------------------- parser
+
+_binding = {':': 80, '%': 60, '^': 50, '*': 40, '/': 40, '+': 30, '-': 30, '&': 20,
+            '=': 10, '<>': 10, '<': 10, '>': 10, '<=': 10, '>=': 10}
+_prefix_binding = 70
+
+
+def _span(a, b):
+    if not (isinstance(a, Ref) and isinstance(b, Ref)):
+        return REF
+    return Ref(a.sheet, min(a.r1, b.r1), min(a.c1, b.c1), max(a.r2, b.r2), max(a.c2, b.c2))
+
+
+class _Parser:
+    """Pratt parser turning tokens into closures node(model) -> value or Ref."""
+
+    def __init__(self, tokens, sheet):
+        self.tokens, self.pos, self.sheet = tokens, 0, sheet
+        self.refs = []  # static references, for the initial evaluation order
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self, value=None):
+        tok = self.peek()
+        if value is not None and tok[1] != value:
+            raise ValueError(f"Expected {value!r}, got {tok[1]!r}")
+        self.pos += 1
+        return tok
+
+    def parse(self):
+        node = self.expression(0)
+        if self.pos != len(self.tokens):
+            raise ValueError(f"Unexpected {self.peek()[1]!r}")
+        return node
+
+    def expression(self, rbp):
+        left = self.prefix()
+        while True:
+            kind, op = self.peek()
+            if kind != 'op' or op not in _binding or _binding[op] <= rbp:
+                return left
+            self.take()
+            if op == '%':
+                left = (lambda n: lambda m: _unary(lambda x: x / 100, m.deref(n(m))))(left)
+                continue
+            # All binary operators are left-associative in Excel
+            right = self.expression(_binding[op])
+            if op == ':':
+                left = (lambda a, b: lambda m: _span(a(m), b(m)))(left, right)
+            else:
+                left = (lambda a, b, op: lambda m: _apply(op, m.deref(a(m)), m.deref(b(m))))(left, right, op)
+
+    def prefix(self):
+        kind, value = self.take()
+        if kind == 'number':
+            v = float(value)
+            return lambda m: v
+        if kind == 'text':
+            v = value[1:-1].replace('""', '"')
+            return lambda m: v
+        if kind == 'bool':
+            v = value == 'TRUE'
+            return lambda m: v
+        if kind == 'error':
+            v = XLError(value)
+            return lambda m: v
+        if kind == 'ref':
+            sheet, r, c = parse_ref(value, self.sheet)
+            self.refs.append((sheet, r, c))
+            ref = Ref(sheet, r, c)
+            return lambda m: ref
+        if kind == 'func':
+            return self.function(value[:-1].upper())
+        if value == '(':
+            node = self.expression(0)
+            self.take(')')
+            return node
+        if value in ('-', '+'):
+            node = self.expression(_prefix_binding)
+            if value == '+':
+                return node
+            return lambda m: _unary(lambda x: -x, m.deref(node(m)))
+        raise ValueError(f"Unexpected {value!r}")
+
+    def function(self, name):
+        if name not in functions:
+            raise ValueError(f"Function {name} is not supported")
+        f, args = functions[name], []
+        if self.peek()[1] != ')':
+            while True:
+                args.append(self.expression(0))
+                if self.peek()[1] != ',':
+                    break
+                self.take(',')
+        self.take(')')
+        return lambda m: f(m, *[a(m) for a in args])
+
+
+def compile_formula(formula, sheet):
+    """(closure, static references) of one formula such as '=SUM(A1:A3)*2'."""
+    parser = _Parser(tokenize(formula.lstrip('=')), sheet)
+    return parser.parse(), parser.refs
+
+
+# --------------------------------------------------------------------- model
+
+def _excel(value):
+    # Cell as pandas' openpyxl reader converts it (blank "", error NaN, integral floats int)
+    if value is None:
+        return ''
+    if isinstance(value, XLError):
+        return np.nan
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+class Model:
+    """
+    The workbook's formula model. Constants and formulas are read with
+    openpyxl; values are computed on first access and kept until an input
+    they depend on changes.
+    """
+
+    def __init__(self, path=workbook.WORKBOOK):
+        import openpyxl
+        from openpyxl.worksheet.formula import ArrayFormula
+
+        book = openpyxl.load_workbook(path)
+        cached = openpyxl.load_workbook(path, data_only=True)
+        self.sheets = book.sheetnames
+        self.size = {}
+        self.constants, self.formulas, self.source, self.cached = {}, {}, {}, {}
+        self.static = {}
+        for ws in book.worksheets:
+            self.size[ws.title] = (ws.max_row, ws.max_column)
+            values = cached[ws.title]
+            for row in ws.iter_rows():
+                for cell in row:
+                    v = cell.value
+                    if v is None:
+                        continue
+                    key = (ws.title, cell.row, cell.column)
+                    text = v.text if isinstance(v, ArrayFormula) else v
+                    if isinstance(text, str) and text.startswith('='):
+                        try:
+                            self.formulas[key], self.static[key] = compile_formula(text, ws.title)
+                        except ValueError as e:
+                            raise FormulaError(f"{self.address(key)} {text}: {e}") from e
+                        self.source[key] = text
+                        self.cached[key] = values.cell(cell.row, cell.column).value
+                    else:
+                        self.constants[key] = v
+        self.values = {}
+        self.precedents = {}
+        self.dependents = defaultdict(set)
+        self._reading = []      # cells read by the formulas being evaluated
+        self._evaluating = set()
+        self.order = None
+
+    # -- evaluation
+
+    def _key(self, ref):
+        return parse_ref(ref) if isinstance(ref, str) else ref
+
+    def value(self, ref):
+        """Current value of one cell, e.g. model.value('UK!C50')."""
+        key = self._key(ref)
+        if self._reading:
+            self._reading[-1].add(key)
+        if key in self.values:
+            return self.values[key]
+        if key not in self.formulas:
+            return self.constants.get(key)
+        return self._evaluate(key)
+
+    def _evaluate(self, key):
+        if key in self._evaluating:
+            raise ValueError(f"Circular reference at {self.address(key)}")
+        self._evaluating.add(key)
+        self._reading.append(set())
+        try:
+            try:
+                result = self.deref(self.formulas[key](self))
+            except _Error as e:
+                result = e.value
+            if isinstance(result, np.ndarray):
+                # Implicit intersection: an array result shows its first element
+                result = result.flat[0]
+            if isinstance(result, np.generic):
+                result = result.item()
+            if result is None:
+                # A formula pointing at a blank cell shows 0
+                result = 0.0
+        finally:
+            reads = self._reading.pop()
+            self._evaluating.discard(key)
+        for p in self.precedents.get(key, ()):
+            self.dependents[p].discard(key)
+        self.precedents[key] = reads
+        for p in reads:
+            self.dependents[p].add(key)
+        self.values[key] = result
+        return result
+
+    def deref(self, x):
+        """Values of a reference (scalar for one cell, 2-D object array otherwise)."""
+        if not isinstance(x, Ref):
+            return x
+        if x.shape == (1, 1):
+            return self.value((x.sheet, x.r1, x.c1))
+        out = np.empty(x.shape, dtype=object)
+        for i, r in enumerate(range(x.r1, x.r2 + 1)):
+            for j, c in enumerate(range(x.c1, x.c2 + 1)):
+                out[i, j] = self.value((x.sheet, r, c))
+        return out
+
+    def evaluate(self):
+        """Compute every formula cell (in dependency order) and return self."""
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(limit, 20000))
+        try:
+            graph = TopologicalSorter({k: [p for p in self.static[k] if p in self.formulas]
+                                       for k in self.formulas})
+            for key in graph.static_order():
+                if key not in self.values:
+                    self._evaluate(key)
+        finally:
+            sys.setrecursionlimit(limit)
+        return self
+
+    def downstream(self, keys):
+        """Formula cells that depend, directly or not, on any of `keys`."""
+        seen, todo = set(), list(keys)
+        while todo:
+            for d in self.dependents.get(todo.pop(), ()):
+                if d not in seen:
+                    seen.add(d)
+                    todo.append(d)
+        return seen
+
+    def update(self, changes):
+        """
+        Set input cells {ref: value} and recalculate only the cells downstream
+        of them. Returns the recalculated cells.
+        """
+        if not self.values:
+            self.evaluate()
+        keys = []
+        for ref, v in changes.items():
+            key = self._key(ref)
+            if key in self.formulas:
+                # Overriding a formula turns it into an input
+                del self.formulas[key]
+                self.static.pop(key, None)
+                for p in self.precedents.pop(key, ()):
+                    self.dependents[p].discard(key)
+            self.constants[key] = v
+            self.values.pop(key, None)
+            keys.append(key)
+        dirty = self.downstream(keys) - set(keys)
+        for key in dirty:
+            self.values.pop(key, None)
+        if self.order is None:
+            # Exact order from the recorded reads
+            self.order = {k: i for i, k in enumerate(
+                TopologicalSorter({k: list(self.precedents.get(k, ())) for k in self.formulas}).static_order())}
+        for key in sorted(dirty, key=lambda k: self.order.get(k, -1)):
+            if key not in self.values:
+                self._evaluate(key)
+        return dirty
+
+    def set(self, ref, value):
+        return self.update({ref: value})
+
+    # -- output
+
+    def address(self, key):
+        sheet, r, c = key
+        return f"{sheet}!{column_letters(c)}{r}"
+
+    def grid(self, sheet_name):
+        """
+        Values of a whole sheet as rows of cells, converted and trimmed of
+        trailing blank rows and columns as pd.read_excel does.
+        """
+        if not self.values:
+            self.evaluate()
+        rows, cols = self.size[sheet_name]
+        data = [[_excel(self.value((sheet_name, r, c))) for c in range(1, cols + 1)] for r in range(1, rows + 1)]
+        while data and all(v == '' for v in data[-1]):
+            data.pop()
+        width = max((max((j + 1 for j, v in enumerate(row) if not isinstance(v, str) or v != ''), default=0)
+                     for row in data), default=0)
+        return [row[:width] for row in data]
+
+    def read_excel(self, sheet_name, header=0, **kwargs):
+        """Drop-in for pd.read_excel(path, sheet_name=..., **kwargs) on the recalculated values."""
+        from pandas.io.parsers import TextParser
+        rows = self.grid(sheet_name)
+        kwargs = {k: list(v) if isinstance(v, range) else v for k, v in kwargs.items()}
+        with TextParser(rows, header=header, **kwargs) as parser:
+            return parser.read(nrows=kwargs.get('nrows'))
+
+    def check(self, rtol=1e-9, atol=1e-9):
+        """Formula cells whose recalculated value differs from the value cached by Excel."""
+        if not self.values:
+            self.evaluate()
+        out = []
+        for key, cached in self.cached.items():
+            v = self.value(key)
+            same = (np.isclose(v, cached, rtol=rtol, atol=atol)
+                    if isinstance(v, (int, float)) and isinstance(cached, (int, float)) else v == cached)
+            if not same:
+                out.append({'cell': self.address(key), 'formula': self.source[key],
+                            'excel': cached, 'python': v})
+        return pd.DataFrame(out, columns=['cell', 'formula', 'excel', 'python'])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--check', action='store_true', help='compare every formula with the values cached by Excel')
+    parser.add_argument('--set', nargs='*', default=[], metavar='CELL=VALUE', help='inputs to change, e.g. Inputs!B26=0.03')
+    parser.add_argument('--sheet', default=None, help='print this sheet after recalculation')
+    args = parser.parse_args()
+
+    model = Model().evaluate()
+    if args.check:
+        diff = model.check()
+        print(f"{len(model.formulas)} formulas, {len(diff)} differ from Excel")
+        if len(diff):
+            print(diff.to_string(index=False))
+    if args.set:
+        changes = {}
+        for item in args.set:
+            ref, value = item.split('=', 1)
+            changes[ref] = float(value)
+        print(f"{len(model.update(changes))} cells recalculated")
+    if args.sheet:
+        print(model.read_excel(args.sheet, **workbook.sheets.get(args.sheet, {})).to_string())
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Anas Abuzayed © 2025
+https://github.com/AnasAbuzayed/H2_CCGT
+
+Description:
+Variance-based (Sobol) global sensitivity analysis of the LCOE. Saltelli
+sample matrices are built over the Sensitivity.py parameters plus the
+financing inputs, the model evaluations are sharded across a process pool
+and first- and total-order indices are returned per fuel with bootstrap
+confidence intervals.
+
+Usage:
+    python global_sensitivity.py sobol --samples 65536 --workers 8
+
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.stats import qmc
+
+import cost_kernel
+import monte_carlo
+
+# Sensitivity parameters (as in Sensitivity.py) plus financing inputs
+params = {
+    'capex': cost_kernel.capex,
+    'FOM': cost_kernel.FOM,
+    'VOM': cost_kernel.VOM,
+    'FLH': 1000,
+    'FOM_storage': cost_kernel.FOM_storage,
+    'days': 3,
+    'store': 1,
+    'Retrofit': 1,
+    'WACC': cost_kernel.WACC,
+    'fcr_p': cost_kernel.fcr_p,
+    'fcr_s': cost_kernel.fcr_s,
+}
+
+
+def lcoe_model(capex, FOM, VOM, FLH, FOM_storage, days, store, Retrofit, WACC, fcr_p, fcr_s):
+    # run_lcoe_analysis of Sensitivity.py with the financing inputs exposed; last axis = fuel
+    E = FLH * cost_kernel.capacity
+    reserve = cost_kernel.storage_reserve(days)
+    storage_capex = np.array([monte_carlo.store_capex[f] for f in monte_carlo.fuels.index])
+    retrofit_pct = np.array([monte_carlo.retrofit[f] for f in monte_carlo.fuels.index])
+
+    storage = cost_kernel.lcos(E, reserve, storage_capex * store, FOM_storage=FOM_storage,
+                               fcr_s=fcr_s, WACC=WACC)
+    firing = cost_kernel.lcoe(E, retrofit_pct * Retrofit, capex=capex, FOM=FOM, VOM=VOM,
+                              fcr_p=fcr_p, WACC=WACC)
+    return storage + firing
+
+
+def saltelli(bounds, n, seed=None):
+    """
+    Saltelli sample matrices A and B (n x D) from a scrambled Sobol sequence.
+    n is rounded up to a power of two to keep the sequence balanced.
+    """
+    D = len(bounds)
+    m = int(np.ceil(np.log2(n)))
+    base = qmc.Sobol(d=2 * D, scramble=True, seed=seed).random_base2(m)
+    lo = np.array([b[0] for b in bounds])
+    hi = np.array([b[1] for b in bounds])
+    return lo + base[:, :D] * (hi - lo), lo + base[:, D:] * (hi - lo)
+
+
+def _evaluate(model, names, A, B):
+    # f(A), f(B) and f(AB_i) for one shard of rows
+    def f(X):
+        return np.asarray(model(**{name: X[:, [k]] for k, name in enumerate(names)}))
+    fAB = []
+    for k in range(len(names)):
+        AB = A.copy()
+        AB[:, k] = B[:, k]
+        fAB.append(f(AB))
+    return f(A), f(B), np.stack(fAB)
+
+
+def _indices(fA, fB, fAB):
+    # Saltelli (2010) first-order and Jansen total-order estimators, per fuel
+    var = np.concatenate((fA, fB)).var(axis=0)
+    S1 = (fB * (fAB - fA)).mean(axis=1) / var
+    ST = 0.5 * ((fA - fAB) ** 2).mean(axis=1) / var
+    return S1, ST
+
+
+def _bootstrap(fA, fB, fAB, bootstrap, rng, block=16):
+    """
+    Bootstrap replicates of S1 and ST. Each resample is a vector of row
+    weights, so a block of replicates is one matrix product over the
+    per-row terms of the estimators.
+    """
+    D, N, F = fAB.shape
+    terms = np.concatenate((fA, fB, fA ** 2, fB ** 2,
+                            (fB * (fAB - fA)).transpose(1, 0, 2).reshape(N, D * F),
+                            (0.5 * (fA - fAB) ** 2).transpose(1, 0, 2).reshape(N, D * F)), axis=1)
+    S1, ST = [], []
+    for start in range(0, bootstrap, block):
+        b = min(block, bootstrap - start)
+        W = np.stack([np.bincount(rng.integers(0, N, N), minlength=N) for _ in range(b)]) / N
+        m = W @ terms
+        mean = (m[:, :F] + m[:, F:2 * F]) / 2
+        var = (m[:, 2 * F:3 * F] + m[:, 3 * F:4 * F]) / 2 - mean ** 2
+        S1.append(m[:, 4 * F:4 * F + D * F].reshape(b, D, F) / var[:, None])
+        ST.append(m[:, 4 * F + D * F:].reshape(b, D, F) / var[:, None])
+    return np.concatenate(S1), np.concatenate(ST)
+
+
+def sobol(model=lcoe_model, params=params, n=2 ** 14, spread=0.2, bounds=None, workers=1,
+          shards=None, bootstrap=200, confidence=0.95, seed=None, index=monte_carlo.fuels.index):
+    """
+    First- (S1) and total-order (ST) Sobol indices of `model` for every fuel.
+
+    Parameters are sampled uniformly within ±`spread` of their base value
+    unless explicit `bounds` {name: (low, high)} are given. The n * (D + 2)
+    model evaluations are split into shards and run on `workers` processes.
+    """
+    names = list(params)
+    if bounds is None:
+        bounds = {}
+    bounds = [bounds.get(name, (params[name] * (1 - spread), params[name] * (1 + spread))) for name in names]
+    A, B = saltelli(bounds, n, seed)
+
+    shards = shards or max(workers, 1) * 4
+    splits = np.array_split(np.arange(len(A)), shards)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_evaluate, [model] * shards, [names] * shards,
+                                  [A[s] for s in splits], [B[s] for s in splits]))
+    else:
+        parts = [_evaluate(model, names, A[s], B[s]) for s in splits]
+    fA = np.concatenate([p[0] for p in parts])
+    fB = np.concatenate([p[1] for p in parts])
+    fAB = np.concatenate([p[2] for p in parts], axis=1)
+
+    S1, ST = _indices(fA, fB, fAB)
+
+    q = [(1 - confidence) / 2, (1 + confidence) / 2]
+    if bootstrap:
+        boot_S1, boot_ST = _bootstrap(fA, fB, fAB, bootstrap, np.random.default_rng(seed))
+        S1_ci = np.quantile(boot_S1, q, axis=0)
+        ST_ci = np.quantile(boot_ST, q, axis=0)
+    else:
+        S1_ci = ST_ci = np.full((2,) + S1.shape, np.nan)
+
+    D, F = len(names), len(index)
+    return pd.DataFrame({
+        'Parameter': np.repeat(names, F),
+        'Fuel': np.tile(np.asarray(index), D),
+        'S1': S1.ravel(),
+        'S1 low': S1_ci[0].ravel(),
+        'S1 high': S1_ci[1].ravel(),
+        'ST': ST.ravel(),
+        'ST low': ST_ci[0].ravel(),
+        'ST high': ST_ci[1].ravel(),
+    })
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='command', required=True)
+    cmd = sub.add_parser('sobol', help='first- and total-order Sobol indices of the LCOE per fuel')
+    cmd.add_argument('--samples', type=int, default=2 ** 14, help='base sample size (rounded up to a power of two)')
+    cmd.add_argument('--spread', type=float, default=0.2, help='relative half-width of the uniform ranges')
+    cmd.add_argument('--workers', type=int, default=1, help='worker processes')
+    cmd.add_argument('--bootstrap', type=int, default=200, help='bootstrap resamples for the confidence intervals')
+    cmd.add_argument('--seed', type=int, default=None)
+    cmd.add_argument('--output', default=None, help='write the table to this CSV file')
+    args = parser.parse_args()
+
+    result = sobol(n=args.samples, spread=args.spread, workers=args.workers,
+                   bootstrap=args.bootstrap, seed=args.seed)
+    if args.output:
+        result.to_csv(args.output, index=False)
+    print(result.round(4).to_string(index=False))
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Anas Abuzayed © 2025
+https://github.com/AnasAbuzayed/H2_CCGT
+
+Description:
+Streaming Monte Carlo uncertainty analysis of LCOE and marginal cost.
+Parameter samples are drawn and evaluated in fixed-size vectorized chunks;
+running means, quantiles (from adaptive histograms) and probability-of-
+cheapest counts are accumulated so memory stays constant in the number of
+samples.
+
+"""
+
+import numpy as np
+import pandas as pd
+
+import cost_kernel
+
+# Fuels, storage CAPEX (EUR/MWh_fuel) and supply chain (EUR/MWh_fuel), shared with Sensitivity.py
+store_capex = cost_kernel.store_capex
+retrofit = cost_kernel.retrofit
+
+fuels = pd.DataFrame.from_dict(cost_kernel.supply_chain, orient='index', dtype=float,
+                               columns=cost_kernel.supply_chain_components)
+fuels['Cracking'] = 0.0
+fuels.loc['NH3c', 'Cracking'] = fuels.loc['NH3'].sum() * cost_kernel.cracking
+
+metrics = ['LCOE', 'MCOE', 'LCOE & MC']
+
+
+def model(capex=cost_kernel.capex, WACC=cost_kernel.WACC, FLH=1000, days=3, store=1, Retrofit=1,
+          Production=1, Synthesis=1, Shipping=1, Distribution=1, Regasification=1, Cracking=1):
+    """
+    LCOE, MCOE and "LCOE & MC" per fuel (last axis follows `fuels.index`).
+    store, Retrofit and the supply-chain arguments are multipliers on the base
+    tables, as 'store' and 'Retrofit' are in Sensitivity.py.
+    """
+    E = FLH * cost_kernel.capacity
+    reserve = cost_kernel.storage_reserve(days)
+    storage_capex = np.array([store_capex[f] for f in fuels.index])
+    retrofit_pct = np.array([retrofit[f] for f in fuels.index])
+
+    storage = cost_kernel.lcos(E, reserve, storage_capex * store, WACC=WACC)
+    firing = cost_kernel.lcoe(E, retrofit_pct * Retrofit, capex=capex, WACC=WACC)
+    fuel = (Production * fuels['Production'].values + Synthesis * fuels['Synthesis'].values +
+            Shipping * fuels['Shipping'].values + Distribution * fuels['Distribution'].values +
+            Regasification * fuels['Regasification'].values +
+            Cracking * fuels['Cracking'].values) / cost_kernel.efficiency
+    LCOE = storage + firing
+    return {'LCOE': LCOE, 'MCOE': fuel, 'LCOE & MC': LCOE + fuel}
+
+
+# ±20 % triangular bands around the paper values, as in the error bars of figure 2
+distributions = {
+    'capex': ('triangular', cost_kernel.capex * 0.8, cost_kernel.capex, cost_kernel.capex * 1.2),
+    'WACC': ('triangular', cost_kernel.WACC * 0.8, cost_kernel.WACC, cost_kernel.WACC * 1.2),
+    'FLH': ('triangular', 800, 1000, 1200),
+    'store': ('triangular', 0.8, 1, 1.2),
+    'Production': ('triangular', 0.8, 1, 1.2),
+    'Synthesis': ('triangular', 0.8, 1, 1.2),
+    'Shipping': ('triangular', 0.8, 1, 1.2),
+    'Distribution': ('triangular', 0.8, 1, 1.2),
+    'Regasification': ('triangular', 0.8, 1, 1.2),
+    'Cracking': ('triangular', 0.8, 1, 1.2),
+}
+
+
+def sample(rng, spec, n):
+    # One column of n draws for a ('kind', *args) specification
+    kind, *args = spec
+    if kind == 'fixed':
+        return np.full((n, 1), args[0], dtype=float)
+    if kind == 'uniform':
+        return rng.uniform(args[0], args[1], (n, 1))
+    if kind == 'triangular':
+        return rng.triangular(args[0], args[1], args[2], (n, 1))
+    if kind == 'normal':
+        return rng.normal(args[0], args[1], (n, 1))
+    if kind == 'lognormal':
+        return rng.lognormal(args[0], args[1], (n, 1))
+    raise ValueError(f"Unknown distribution '{kind}'")
+
+
+class StreamingHistogram:
+    """
+    Fixed-size histograms of K series updated chunk by chunk. The range of a
+    series doubles (merging bins pairwise) whenever a value falls outside it,
+    so quantiles stay within one bin width of the exact value.
+    """
+
+    def __init__(self, first, bins=4096):
+        first = np.asarray(first, dtype=float)
+        lo, hi = first.min(axis=0), first.max(axis=0)
+        pad = np.maximum((hi - lo) * 0.5, np.abs(hi) * 1e-6 + 1e-12)
+        self.bins = bins
+        self.lo, self.hi = lo - pad, hi + pad
+        self.counts = np.zeros((len(lo), bins), dtype=np.int64)
+        self.n = 0
+        self.sum = np.zeros(len(lo))
+        self.sumsq = np.zeros(len(lo))
+        self.min = np.full(len(lo), np.inf)
+        self.max = np.full(len(lo), -np.inf)
+
+    def _grow(self, k, low, high):
+        while low < self.lo[k] or high >= self.hi[k]:
+            width = self.hi[k] - self.lo[k]
+            merged = self.counts[k].reshape(-1, 2).sum(axis=1)
+            if low < self.lo[k]:
+                self.counts[k] = np.concatenate((np.zeros(self.bins // 2, dtype=np.int64), merged))
+                self.lo[k] -= width
+            else:
+                self.counts[k] = np.concatenate((merged, np.zeros(self.bins // 2, dtype=np.int64)))
+                self.hi[k] += width
+
+    def update(self, x):
+        x = np.asarray(x, dtype=float)                      # (n, K)
+        if not np.isfinite(x).all():
+            raise ValueError("Non-finite values, check the sampled parameter ranges")
+        low, high = x.min(axis=0), x.max(axis=0)
+        for k in np.flatnonzero((low < self.lo) | (high >= self.hi)):
+            self._grow(k, low[k], high[k])
+        idx = ((x - self.lo) / (self.hi - self.lo) * self.bins).astype(np.int64)
+        idx = np.clip(idx, 0, self.bins - 1) + np.arange(x.shape[1]) * self.bins
+        self.counts += np.bincount(idx.ravel(), minlength=self.counts.size).reshape(self.counts.shape)
+        self.n += len(x)
+        self.sum += x.sum(axis=0)
+        self.sumsq += (x ** 2).sum(axis=0)
+        self.min = np.minimum(self.min, low)
+        self.max = np.maximum(self.max, high)
+
+    def mean(self):
+        return self.sum / self.n
+
+    def std(self):
+        return np.sqrt(np.maximum(self.sumsq / self.n - self.mean() ** 2, 0))
+
+    def quantile(self, q):
+        # Linear interpolation inside the bin holding the q-th sample
+        cum = np.cumsum(self.counts, axis=1)
+        target = q * self.n
+        j = np.minimum((cum < target).sum(axis=1), self.bins - 1)
+        rows = np.arange(len(cum))
+        before = np.where(j > 0, cum[rows, np.maximum(j - 1, 0)], 0)
+        inside = self.counts[rows, j]
+        frac = np.where(inside > 0, (target - before) / np.maximum(inside, 1), 0)
+        width = (self.hi - self.lo) / self.bins
+        return np.clip(self.lo + (j + frac) * width, self.min, self.max)
+
+
+def _cheapest(x, rtol):
+    # Share of every sample going to each fuel: fuels tied with the minimum split it equally
+    low = x.min(axis=1, keepdims=True)
+    tied = x <= low + rtol * np.abs(low)
+    return (tied / tied.sum(axis=1, keepdims=True)).sum(axis=0)
+
+
+def run(n_samples, distributions=distributions, chunk_size=100_000, seed=None,
+        quantiles=(0.05, 0.25, 0.5, 0.75, 0.95), model=model, index=fuels.index, metrics=metrics,
+        rtol=1e-9):
+    """
+    Monte Carlo over `n_samples` draws of `distributions`, evaluated in chunks.
+
+    Returns a DataFrame indexed by (Metric, Fuel) with mean, std, min, max,
+    the requested percentiles and the probability of being the cheapest fuel.
+    Fuels within `rtol` of the cheapest share a sample equally.
+    """
+    rng = np.random.default_rng(seed)
+    F = len(index)
+    hist = None
+    cheapest = np.zeros((len(metrics), F))
+    done = 0
+    while done < n_samples:
+        n = min(chunk_size, n_samples - done)
+        draws = {name: sample(rng, spec, n) for name, spec in distributions.items()}
+        out = model(**draws)
+        values = np.concatenate([np.broadcast_to(out[m], (n, F)) for m in metrics], axis=1)
+        if hist is None:
+            hist = StreamingHistogram(values)
+        hist.update(values)
+        for k, m in enumerate(metrics):
+            cheapest[k] += _cheapest(np.broadcast_to(out[m], (n, F)), rtol)
+        done += n
+
+    summary = pd.DataFrame({
+        'Metric': np.repeat(metrics, F),
+        'Fuel': np.tile(np.asarray(index), len(metrics)),
+        'mean': hist.mean(),
+        'std': hist.std(),
+        'min': hist.min,
+        'max': hist.max,
+    })
+    for q in quantiles:
+        summary[f'p{q * 100:g}'] = hist.quantile(q)
+    summary['P(cheapest)'] = (cheapest / n_samples).ravel()
+    return summary.set_index(['Metric', 'Fuel'])
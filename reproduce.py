@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Anas Abuzayed © 2025
+https://github.com/AnasAbuzayed/H2_CCGT
+
+Description:
+Reproduces all figures of the paper in a single interpreter. The plotting
+stacks are imported once, and the sheets read with workbook.read_excel are
+parsed once and memoised for the scripts that read the same sheet view (see
+workbook.py); everything derived from them is recomputed by each script.
+In headless mode no window or browser tab is opened: matplotlib uses the
+Agg backend and fig.show()/plt.show() are skipped. Plotly images are
+exported together at the end through one warm kaleido process (see
+figure_export.py). The wall time of every figure is reported at the end.
+
+With --workers N the figures are rendered on N processes. Scripts that
+expose `panels` and `render(*panel)` (figure 5) are split into one job per
+panel; their data is computed once in the parent and inherited by the
+workers where the platform forks. Outputs are identical to a serial run.
+
+Usage:
+    python reproduce.py --headless
+    python reproduce.py --headless fig5 figA3
+    python reproduce.py --workers 16
+    python reproduce.py --headless --telemetry run1   # stage timings, see telemetry.py
+
+"""
+
+import argparse
+import multiprocessing
+import os
+import runpy
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+import figure_export
+import telemetry
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Figure -> script, in paper order
+figures = {
+    'fig2': 'Single-Fuel-Marginal-Cost.py',
+    'fig3': 'Single-Fuel-LCOE.py',
+    'fig4': 'Double_final_v2.py',
+    'fig5': 'LCOE_Ternary_final_v2.py',
+    'fig6': 'Retrofit_capital_all.py',
+    'fig7': 'Keadby2.py',
+    'figA1-A2': 'Sensitivity.py',
+    'figA3': 'FLH_variation.py',
+}
+
+# Figures whose scripts can render single panels (see the --workers option)
+partitioned = {'fig5'}
+
+_namespaces = {}
+_rc = {}
+
+
+def _noop(*args, **kwargs):
+    pass
+
+
+def setup(headless=False):
+    """Import the plotting stacks once; in headless mode disable interactive display."""
+    if headless:
+        import matplotlib
+        matplotlib.use('Agg')
+    import matplotlib
+    import matplotlib.pyplot as plt
+    import numpy  # noqa: F401
+    import pandas  # noqa: F401
+    import plotly.graph_objects  # noqa: F401
+    import plotly.io  # noqa: F401
+    import seaborn  # noqa: F401
+    import ternary  # noqa: F401
+    if headless:
+        from plotly.basedatatypes import BaseFigure
+        plt.show = _noop
+        BaseFigure.show = _noop
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    # Styling set by one script (e.g. sns.set_style) must not leak into the next
+    _rc.update({k: v for k, v in matplotlib.rcParams.items() if k != 'backend'})
+
+
+def _reset():
+    import matplotlib
+    matplotlib.rcParams.update(_rc)
+
+
+def run(names=None, headless=False, out=sys.stdout):
+    """
+    Run the figure scripts `names` (default: all) and return {name: seconds}.
+    A failing figure is reported and does not stop the others; its time is None.
+    """
+    names = list(figures) if not names else names
+    unknown = [n for n in names if n not in figures]
+    if unknown:
+        raise ValueError(f"Unknown figure(s) {unknown}, choose from {list(figures)}")
+
+    start = time.perf_counter()
+    setup(headless)
+    import matplotlib.pyplot as plt
+    timings = {'imports': time.perf_counter() - start}
+
+    with figure_export.collect() as specs:
+        for name in names:
+            print(f'{name}: {figures[name]}', file=out, flush=True)
+            start = time.perf_counter()
+            try:
+                _reset()
+                with telemetry.stage(name):
+                    runpy.run_path(os.path.join(ROOT, figures[name]), run_name='__main__')
+                timings[name] = time.perf_counter() - start
+            except Exception:
+                traceback.print_exc()
+                timings[name] = None
+            finally:
+                plt.close('all')
+    _export(specs, timings, out)
+    return timings
+
+
+def _export(specs, timings, out=sys.stdout):
+    # All queued plotly images in one exporter session
+    if not specs:
+        return
+    print(f'export: {len(specs)} plotly image(s)', file=out, flush=True)
+    start = time.perf_counter()
+    try:
+        with figure_export.server():
+            figure_export.export(specs)
+        timings['export'] = time.perf_counter() - start
+    except Exception:
+        traceback.print_exc()
+        timings['export'] = None
+
+
+def _namespace(name):
+    # Script globals without its __main__ block, computed once per process
+    if name not in _namespaces:
+        _namespaces[name] = runpy.run_path(os.path.join(ROOT, figures[name]), run_name=f'figure_{name}')
+    return _namespaces[name]
+
+
+def jobs(names=None):
+    # (figure, panel) pairs, panel None for a whole script
+    out = []
+    for name in (list(figures) if not names else names):
+        if name in partitioned:
+            out += [(name, panel) for panel in _namespace(name)['panels']]
+        else:
+            out.append((name, None))
+    return out
+
+
+def _render(job):
+    import matplotlib.pyplot as plt
+    # Returns the job time, the plotly images it queued for export and its telemetry stages
+    name, panel = job
+    start = time.perf_counter()
+    with figure_export.collect() as specs, telemetry.capture() as events:
+        try:
+            _reset()
+            if panel is None:
+                with telemetry.stage(name):
+                    runpy.run_path(os.path.join(ROOT, figures[name]), run_name='__main__')
+            else:
+                with telemetry.stage(f"render {' - '.join(panel)}"):
+                    _namespace(name)['render'](*panel)
+            return time.perf_counter() - start, specs, events
+        except Exception:
+            traceback.print_exc()
+            return None, specs, events
+        finally:
+            plt.close('all')
+
+
+def run_parallel(names=None, workers=os.cpu_count(), out=sys.stdout):
+    """
+    Render the figures `names` (default: all) headless on `workers` processes
+    and return {job: seconds}, plus the wall time of the whole render phase.
+    """
+    names = list(figures) if not names else names
+    unknown = [n for n in names if n not in figures]
+    if unknown:
+        raise ValueError(f"Unknown figure(s) {unknown}, choose from {list(figures)}")
+
+    start = time.perf_counter()
+    setup(headless=True)
+    timings = {'imports': time.perf_counter() - start}
+
+    # Shared data is computed here before the workers fork
+    start = time.perf_counter()
+    fork = 'fork' in multiprocessing.get_all_start_methods()
+    if fork:
+        [_namespace(name) for name in names if name in partitioned]
+    todo = jobs(names)
+    # Longest jobs first: the partitioned panels are the heaviest
+    todo.sort(key=lambda job: job[1] is None)
+    timings['data'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    context = multiprocessing.get_context('fork' if fork else 'spawn')
+    specs = []
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=setup, initargs=(True,)) as pool:
+        for job, (seconds, queued, events) in zip(todo, pool.map(_render, todo)):
+            label = job[0] if job[1] is None else f"{job[0]} {' - '.join(job[1])}"
+            print(label, file=out, flush=True)
+            timings[label] = seconds
+            specs += queued
+            telemetry.extend(events)
+    timings['render (wall)'] = time.perf_counter() - start
+    # Plotly images are exported by one warm exporter rather than one per worker
+    _export(specs, timings, out)
+    return timings
+
+
+def report(timings, out=sys.stdout):
+    width = max(len(name) for name in timings) + 2
+    print(f"\n{'Figure':<{width}}{'Time (s)':>10}", file=out)
+    for name, seconds in timings.items():
+        print(f"{name:<{width}}{'failed' if seconds is None else f'{seconds:.2f}':>10}", file=out)
+    if 'render (wall)' not in timings:
+        total = sum(s for s in timings.values() if s is not None)
+        print(f"{'Total':<{width}}{total:>10.2f}", file=out)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('figures', nargs='*', help=f'figures to build (default: all of {", ".join(figures)})')
+    parser.add_argument('--headless', action='store_true', help='no windows or browser tabs (Agg backend)')
+    parser.add_argument('--workers', type=int, default=1, help='render on this many processes (implies --headless)')
+    parser.add_argument('--telemetry', nargs='?', const='telemetry', default=None, metavar='PREFIX',
+                        help='record stage timings to PREFIX.json and PREFIX.trace.json')
+    parser.add_argument('--telemetry-no-memory', action='store_true', help='record timings without tracemalloc')
+    args = parser.parse_args()
+
+    if args.telemetry:
+        telemetry.enable(args.telemetry, memory=not args.telemetry_no_memory)
+
+    if args.workers > 1:
+        timings = run_parallel(args.figures, workers=args.workers)
+    else:
+        timings = run(args.figures, headless=args.headless)
+    report(timings)
+    sys.exit(any(s is None for s in timings.values()))
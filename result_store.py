@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Anas Abuzayed © 2025
+https://github.com/AnasAbuzayed/H2_CCGT
+
+Description:
+Typed columnar container for sweep results. Columns are preallocated NumPy
+arrays (float64 or float32 values, integer codes for categorical columns
+such as the blend name) and are filled slice by slice. Conversion to a
+DataFrame or an Arrow table reuses the arrays without copying them.
+
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class ResultStore:
+    """
+    Preallocated result table of `rows` rows.
+
+    columns:    {name: dtype} of the numeric columns
+    categories: {name: list of labels} of the categorical columns, stored as codes
+    """
+
+    def __init__(self, rows, columns, categories=None):
+        categories = categories or {}
+        self.rows = rows
+        self.categories = {name: list(labels) for name, labels in categories.items()}
+        self.order = list(categories) + [c for c in columns if c not in categories]
+        self.arrays = {}
+        for name in self.order:
+            if name in categories:
+                dtype = np.int8 if len(categories[name]) < 128 else np.int32
+            else:
+                dtype = columns[name]
+            self.arrays[name] = np.zeros(rows, dtype=dtype)
+        self.filled = 0
+
+    def __len__(self):
+        return self.filled
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in self.arrays.values())
+
+    def write(self, start, **values):
+        """
+        Fill rows start:start + n of the given columns. Categorical columns take
+        a label (broadcast) or an array of codes; numeric columns take scalars or arrays.
+        """
+        n = max(np.size(v) for v in values.values())
+        for name, value in values.items():
+            if name in self.categories and isinstance(value, str):
+                value = self.categories[name].index(value)
+            self.arrays[name][start:start + n] = value
+        self.filled = max(self.filled, start + n)
+        return start + n
+
+    def append(self, **values):
+        return self.write(self.filled, **values)
+
+    def to_frame(self):
+        # Views of the filled rows; numeric columns are not copied
+        data = {}
+        for name in self.order:
+            a = self.arrays[name][:self.filled]
+            if name in self.categories:
+                a = pd.Categorical.from_codes(a, self.categories[name])
+            data[name] = a
+        return pd.DataFrame(data, copy=False)
+
+    def to_arrow(self):
+        import pyarrow as pa
+        data = {}
+        for name in self.order:
+            a = self.arrays[name][:self.filled]
+            if name in self.categories:
+                a = pa.DictionaryArray.from_arrays(a, pa.array(self.categories[name]))
+            data[name] = a
+        return pa.table(data)
+
+    def to_parquet(self, path, **kwargs):
+        import pyarrow.parquet as pq
+        pq.write_table(self.to_arrow(), path, **kwargs)
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Anas Abuzayed © 2025
+https://github.com/AnasAbuzayed/H2_CCGT
+
+Description:
+One-at-a-time sensitivity engine. Every parameter x perturbation x fuel
+combination is evaluated with a single call of a vectorized cost model.
+
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def perturb(params, changes):
+    """
+    Perturbed parameter tensors for a one-at-a-time sweep.
+
+    Returns {name: array (P, C, 1) or (P, C, F)} where row p scales only the
+    p-th parameter by (1 + change) and keeps all others at their base value.
+    """
+    changes = np.asarray(changes, dtype=float)
+    P = len(params)
+    values = {}
+    for k, (name, base) in enumerate(params.items()):
+        scale = np.ones((P, len(changes), 1))
+        scale[k, :, 0] = 1 + changes
+        values[name] = scale * np.asarray(base, dtype=float)
+    return values
+
+
+def oat_sensitivity(model, params, changes, index, value_name='ΔLCOE (EUR/MWh)'):
+    """
+    Tidy one-at-a-time sensitivity table.
+
+    model:   vectorized model(**params) returning an array whose last axis
+             follows `index` (one entry per fuel)
+    params:  {name: base value}, scalars or per-fuel arrays
+    changes: relative perturbations, e.g. np.arange(-0.2, 0.21, 0.02)
+    """
+    changes = np.asarray(changes, dtype=float)
+    baseline = np.asarray(model(**params))
+    delta = np.asarray(model(**perturb(params, changes))) - baseline   # (P, C, F)
+    P, C, F = len(params), len(changes), len(index)
+    delta = np.broadcast_to(delta, (P, C, F))
+    return pd.DataFrame({
+        'Parameter': np.repeat(list(params), C * F),
+        'Change (%)': np.tile(np.repeat(changes * 100, F), P),
+        'Fuel': np.tile(np.asarray(index), P * C),
+        value_name: delta.ravel(),
+    })
+
+
+def gradient(model, params, h=1e-20):
+    """
+    Partial derivatives of a vectorized model with respect to every parameter,
+    evaluated at the operating point `params` in a single model call.
+
+    Uses complex-step forward differentiation, d model / dp = Im(model(p + ih)) / h,
+    which carries no truncation or cancellation error, so the result is exact to
+    machine precision. The model must be written with plain NumPy arithmetic.
+    Parameters may carry leading batch axes (many operating points at once).
+
+    Returns an array (P, ...) with the parameter axis first, in the order of `params`.
+    """
+    nd = max([np.ndim(base) for base in params.values()] + [1])
+    values = {}
+    for k, (name, base) in enumerate(params.items()):
+        step = np.zeros((len(params),) + (1,) * nd, dtype=complex)
+        step[k] = 1j * h
+        values[name] = np.asarray(base, dtype=float) + step
+    return np.imag(np.asarray(model(**values))) / h
+
+
+def elasticities(model, params, h=1e-20):
+    # (dM / M) / (dp / p) for every parameter, parameter axis first
+    value = np.asarray(model(**params), dtype=float)
+    base = np.stack([np.broadcast_to(np.asarray(v, dtype=float), value.shape) for v in params.values()])
+    return gradient(model, params, h) * base / value
+
+
+def tornado(model, params, index, change=0.2):
+    """
+    Tornado ranking at a single operating point: derivative, elasticity and the
+    linearized metric change for a -/+ `change` relative perturbation of every
+    parameter, ranked per fuel by absolute elasticity.
+    """
+    value = np.asarray(model(**params), dtype=float)
+    base = np.stack([np.broadcast_to(np.asarray(v, dtype=float), value.shape) for v in params.values()])
+    grad = gradient(model, params)
+    P, F = len(params), len(index)
+    df = pd.DataFrame({
+        'Parameter': np.repeat(list(params), F),
+        'Fuel': np.tile(np.asarray(index), P),
+        'Derivative': grad.ravel(),
+        'Elasticity': (grad * base / value).ravel(),
+        'Low': (-change * grad * base).ravel(),
+        'High': (change * grad * base).ravel(),
+    })
+    df['Rank'] = df['Elasticity'].abs().groupby(df['Fuel']).rank(ascending=False, method='first').astype(int)
+    return df.sort_values(['Fuel', 'Rank'], kind='stable').reset_index(drop=True)
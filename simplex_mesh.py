@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Anas Abuzayed © 2025
+https://github.com/AnasAbuzayed/H2_CCGT
+
+Description:
+Adaptive triangulated mesh on the 2-simplex. Triangles are split into four
+wherever linear interpolation between their corners misses the metric at an
+edge midpoint by more than a tolerance, so points concentrate where the map
+is curved or jumps (e.g. where the retrofit cost switches) and stay sparse
+where it is nearly linear. All new points of a level are evaluated in one
+vectorized call.
+
+"""
+
+import numpy as np
+
+
+def refine(f, tol=0.002, max_depth=9, min_depth=3, relative=True):
+    """
+    Adaptive sampling of a vectorized metric on the simplex.
+
+    f:         f(X) for barycentric points X (M, 3), returning (M,) or (M, K) values
+    tol:       allowed interpolation error, as a fraction of each metric's range
+               (relative=True) or in the metric's units
+    max_depth: finest level; 2 ** max_depth steps per edge (9 = 0.002 resolution)
+    min_depth: levels refined uniformly before the error test
+
+    Returns the points (P, 3) and values (P, K). ternary_plot.tripcolor draws
+    them directly (its Delaunay triangulation is conforming).
+    """
+    R = 2 ** max_depth
+    # Lattice coordinates (i, j), k = R - i - j, are exact at every level
+    corners = np.array([[R, 0], [0, R], [0, 0]])
+    tri = corners[None]
+    keys = {}
+    points, values = [], []
+
+    def lookup(ij):
+        # Index of every lattice point, evaluating the new ones in one call
+        code = ij[:, 0] * (R + 1) + ij[:, 1]
+        new, first = np.unique(code, return_index=True)
+        todo = [(c, k) for c, k in zip(new, first) if c not in keys]
+        if todo:
+            sel = ij[[k for _, k in todo]]
+            X = np.column_stack((sel, R - sel.sum(axis=1))) / R
+            out = np.asarray(f(X), dtype=float).reshape(len(X), -1)
+            for n, (c, _) in enumerate(todo, start=len(keys)):
+                keys[c] = n
+            points.append(X)
+            values.append(out)
+        return np.array([keys[c] for c in code])
+
+    def split(tri):
+        a, b, c = tri[:, 0], tri[:, 1], tri[:, 2]
+        ab, bc, ca = (a + b) // 2, (b + c) // 2, (c + a) // 2
+        return np.concatenate([np.stack(t, axis=1) for t in
+                               [(a, ab, ca), (ab, b, bc), (ca, bc, c), (ab, bc, ca)]])
+
+    lookup(corners)
+    for depth in range(max_depth):
+        mids = [(tri[:, e] + tri[:, (e + 1) % 3]) // 2 for e in range(3)]
+        idx = [lookup(m) for m in mids]
+        if depth < min_depth:
+            tri = split(tri)
+            continue
+        V = np.concatenate(values)
+        scale = np.ptp(V, axis=0) if relative else np.ones(V.shape[1])
+        scale = np.where(scale > 0, scale, 1)
+        err = np.zeros(len(tri))
+        for e in range(3):
+            ends = (lookup(tri[:, e]), lookup(tri[:, (e + 1) % 3]))
+            miss = np.abs(V[idx[e]] - (V[ends[0]] + V[ends[1]]) / 2) / scale
+            err = np.maximum(err, miss.max(axis=1))
+        tri = split(tri[err > tol])
+        if not len(tri):
+            break
+
+    return np.concatenate(points), np.concatenate(values)
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Anas Abuzayed © 2025
+https://github.com/AnasAbuzayed/H2_CCGT
+
+Description:
+Stage-level timing and memory telemetry. Pipeline stages are wrapped in
+`with telemetry.stage("ternary sweep"):`, which records wall time, CPU time
+and the tracemalloc peak of the stage. Workbook reads, matplotlib savefig
+calls and plotly exports are recorded automatically. At exit the stages are
+written as JSON ({prefix}.json, with a per-stage summary) and as a Chrome
+trace ({prefix}.trace.json, open in chrome://tracing or ui.perfetto.dev).
+
+Telemetry is off unless the H2CCGT_TELEMETRY environment variable is set
+(to 1 or to an output prefix) or reproduce.py runs with --telemetry; when
+off, `stage` returns a shared no-op context. tracemalloc slows down
+allocation-heavy stages (e.g. large scatter plots) several times; set
+H2CCGT_TELEMETRY_MEMORY=0 (or pass --telemetry-no-memory) for timings only.
+
+Usage:
+    H2CCGT_TELEMETRY=1 python LCOE_Ternary_final_v2.py
+    python reproduce.py --headless --telemetry run1
+
+"""
+
+import atexit
+import contextlib
+import json
+import multiprocessing
+import os
+import threading
+import time
+import tracemalloc
+
+ENV = 'H2CCGT_TELEMETRY'
+ENV_MEMORY = 'H2CCGT_TELEMETRY_MEMORY'
+
+_enabled = False
+_memory = False
+_prefix = 'telemetry'
+_events = []
+_stack = []  # open stages: [start memory, peak of finished children]
+_off = contextlib.nullcontext()
+
+
+class _Stage:
+
+    __slots__ = ('name', 'wall', 'cpu', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        current = 0
+        if _memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if _stack:
+                _stack[-1][1] = max(_stack[-1][1], peak)
+            tracemalloc.reset_peak()
+        _stack.append([current, 0])
+        self.start = time.time()
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        event = {'name': self.name, 'start': self.start, 'wall': wall, 'cpu': cpu,
+                 'pid': os.getpid(), 'tid': threading.get_ident(), 'depth': len(_stack) - 1}
+        start, children = _stack.pop()
+        if _memory:
+            peak = max(tracemalloc.get_traced_memory()[1], children)
+            event['peak_bytes'] = peak - start
+            if _stack:
+                _stack[-1][1] = max(_stack[-1][1], peak)
+        _events.append(event)
+        return False
+
+
+def stage(name):
+    """Context manager recording one pipeline stage (a no-op while telemetry is off)."""
+    if not _enabled:
+        return _off
+    return _Stage(name)
+
+
+def enabled():
+    return _enabled
+
+
+def enable(prefix='telemetry', memory=True):
+    """
+    Start recording. Stages are written to {prefix}.json and {prefix}.trace.json
+    at exit; memory=False skips tracemalloc (which slows allocation-heavy code).
+    """
+    global _enabled, _memory, _prefix
+    if not _enabled:
+        atexit.register(_dump_at_exit)
+    _enabled, _memory, _prefix = True, memory, prefix
+    # Spawned worker processes pick the settings up from the environment
+    os.environ[ENV] = prefix
+    os.environ[ENV_MEMORY] = str(int(memory))
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _instrument_savefig()
+
+
+def _instrument_savefig():
+    try:
+        from matplotlib.figure import Figure
+    except ImportError:
+        return
+    savefig = Figure.savefig
+    if getattr(savefig, 'telemetry', False):
+        return
+
+    def wrapper(self, fname, *args, **kwargs):
+        with stage(f'savefig {os.path.basename(str(fname))}'):
+            return savefig(self, fname, *args, **kwargs)
+    wrapper.telemetry = True
+    Figure.savefig = wrapper
+
+
+@contextlib.contextmanager
+def capture():
+    """Collect the stages recorded in the block into the yielded list instead (worker processes)."""
+    global _events
+    previous, _events = _events, []
+    try:
+        yield _events
+    finally:
+        _events = previous
+
+
+def extend(events):
+    # Stages recorded by other processes
+    _events.extend(events)
+
+
+def summary(events=None):
+    """Count, total wall and CPU time and largest peak per stage name."""
+    out = {}
+    for e in (_events if events is None else events):
+        s = out.setdefault(e['name'], {'count': 0, 'wall': 0.0, 'cpu': 0.0, 'peak_bytes': 0})
+        s['count'] += 1
+        s['wall'] += e['wall']
+        s['cpu'] += e['cpu']
+        s['peak_bytes'] = max(s['peak_bytes'], e.get('peak_bytes', 0))
+    return out
+
+
+def chrome_trace(events=None):
+    # Complete ('X') events in microseconds
+    events = _events if events is None else events
+    return {'displayTimeUnit': 'ms', 'traceEvents': [
+        {'name': e['name'], 'ph': 'X', 'ts': e['start'] * 1e6, 'dur': e['wall'] * 1e6,
+         'pid': e['pid'], 'tid': e['tid'],
+         'args': {'cpu_s': e['cpu'], 'peak_MB': e.get('peak_bytes', 0) / 1e6}}
+        for e in events]}
+
+
+def dump(prefix=None):
+    """Write {prefix}.json (stages and summary) and {prefix}.trace.json."""
+    prefix = prefix or _prefix
+    folder = os.path.dirname(prefix)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with open(f'{prefix}.json', 'w') as f:
+        json.dump({'stages': _events, 'summary': summary()}, f, indent=1)
+    with open(f'{prefix}.trace.json', 'w') as f:
+        json.dump(chrome_trace(), f)
+
+
+def _dump_at_exit():
+    # Worker processes hand their stages to the parent instead
+    if _events and multiprocessing.parent_process() is None:
+        dump()
+
+
+if os.environ.get(ENV):
+    enable('telemetry' if os.environ[ENV] == '1' else os.environ[ENV],
+           memory=os.environ.get(ENV_MEMORY, '1') != '0')
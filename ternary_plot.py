@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Anas Abuzayed © 2025
+https://github.com/AnasAbuzayed/H2_CCGT
+
+Description:
+Batched drawing helpers for python-ternary axes. Points are projected to
+Cartesian coordinates in one NumPy operation and every panel is drawn with a
+single scatter collection instead of one artist per point.
+
+"""
+
+import numpy as np
+
+SQRT3OVER2 = np.sqrt(3) / 2.
+
+
+def project(points, permutation=None):
+    # Vectorized ternary.helpers.project_point for an (N, 3) array
+    points = np.asarray(points, dtype=float)
+    if permutation:
+        points = points[:, [int(i) for i in permutation]]
+    return points[:, 0] + points[:, 1] / 2., SQRT3OVER2 * points[:, 1]
+
+
+def scatter(tax, points, values, cmap, norm, **kwargs):
+    # Colour mapping identical to tax.scatter([point], color=cmap(norm(value)))
+    xs, ys = project(points, getattr(tax, '_permutation', None))
+    return tax.get_axes().scatter(xs, ys, c=values, cmap=cmap, norm=norm, **kwargs)
+
+
+def tripcolor(tax, points, values, cmap, norm, **kwargs):
+    # Raster alternative to scatter: one Gouraud-shaded triangulation per panel
+    xs, ys = project(points, getattr(tax, '_permutation', None))
+    return tax.get_axes().tripcolor(xs, ys, values, cmap=cmap, norm=norm, shading='gouraud', **kwargs)
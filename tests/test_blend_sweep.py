@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+import tracemalloc
+
+import numpy as np
+import pytest
+
+import blend_sweep
+
+
+def _peak(d, n, chunk_size):
+    tracemalloc.start()
+    try:
+        for _ in blend_sweep.simplex_chunks(d, n, chunk_size):
+            pass
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.parametrize('d, n', [(2, 30), (3, 25), (4, 12), (5, 7)])
+def test_simplex_chunks_lattice(d, n):
+    X = np.concatenate(list(blend_sweep.simplex_chunks(d, n, chunk_size=37)))
+    assert len(X) == blend_sweep.lattice_size(d, n)
+    assert np.allclose(X.sum(axis=1), 1)
+    # Lexicographic order without duplicates
+    keys = [tuple(row) for row in np.rint(X * n).astype(int)]
+    assert keys == sorted(set(keys))
+
+
+def test_simplex_chunks_sizes():
+    sizes = [len(c) for c in blend_sweep.simplex_chunks(3, 100, chunk_size=1000)]
+    assert all(s == 1000 for s in sizes[:-1]) and sum(sizes) == blend_sweep.lattice_size(3, 100)
+
+
+@pytest.mark.parametrize('d, small, large', [(3, 300, 3000), (4, 100, 300)])
+def test_simplex_chunks_memory_bounded_by_chunk_size(d, small, large):
+    # Memory depends on chunk_size only: the peak stays flat as n grows
+    chunk_size = 10_000
+    assert _peak(d, large, chunk_size) < 1.5 * _peak(d, small, chunk_size)
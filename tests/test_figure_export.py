@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+import figure_export
+
+
+def test_batch_joins_open_queue(monkeypatch):
+    calls = []
+    monkeypatch.setattr(figure_export, 'export', lambda specs: calls.append([s['file'] for s in specs]))
+    with figure_export.collect() as specs:
+        with figure_export.batch():
+            figure_export.write_image({'data': []}, 'a.png')
+            figure_export.write_image({'data': []}, 'b.png')
+    assert calls == []
+    assert [s['file'] for s in specs] == ['a.png', 'b.png']
+
+
+def test_batch_exports_once(monkeypatch):
+    calls = []
+    monkeypatch.setattr(figure_export, 'export', lambda specs: calls.append([s['file'] for s in specs]))
+    monkeypatch.setattr(figure_export, '_chrome', lambda: None)
+    with figure_export.batch():
+        figure_export.write_image({'data': []}, 'a.png')
+        figure_export.write_image({'data': []}, 'b.png')
+    assert calls == [['a.png', 'b.png']]
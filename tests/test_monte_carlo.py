@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+
+import monte_carlo
+
+
+def _twins(x):
+    # Two fuels with the same cost in every sample
+    return {'LCOE': np.hstack([x, x])}
+
+
+def test_ties_split_equally():
+    summary = monte_carlo.run(1000, distributions={'x': ('uniform', 50, 150)}, chunk_size=300, seed=1,
+                              model=_twins, index=['A', 'B'], metrics=['LCOE'])
+    assert np.allclose(summary['P(cheapest)'], [0.5, 0.5])
+
+
+def test_cheapest_sums_to_one():
+    summary = monte_carlo.run(2000, chunk_size=700, seed=2)
+    assert np.allclose(summary['P(cheapest)'].groupby(level='Metric').sum(), 1)
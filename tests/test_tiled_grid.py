@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+import cost_kernel
+import tiled_grid
+
+
+def _lcoe(r0, r1):
+    # LCOE over FLH (rows) x retrofit share (columns), NaN beyond 20 % retrofit
+    FLH = np.arange(r0, r1)[:, None] * 50.0 + 1000
+    pct = np.linspace(0, 0.3, 40)[None, :]
+    out = cost_kernel.lcoe(FLH * cost_kernel.capacity, pct)
+    return np.where(pct <= 0.2, out, np.nan)
+
+
+def test_histogram_counts_every_cell():
+    shape = (100, 40)
+    hist = tiled_grid.Histogram(64, range=(0, 200))
+    tiled_grid.evaluate(_lcoe, shape, tile_rows=7, reducers=[hist])
+    grid = _lcoe(0, shape[0])
+    assert np.nanmin(grid) > 1
+    assert hist.counts.sum() == np.count_nonzero(~np.isnan(grid))
+
+
+def test_histogram_count_needs_range():
+    with pytest.raises(ValueError):
+        tiled_grid.Histogram(64)
+    assert len(tiled_grid.Histogram([0, 100, 200]).counts) == 2
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Anas Abuzayed © 2025
+https://github.com/AnasAbuzayed/H2_CCGT
+
+Description:
+Out-of-core evaluation of large 2-D cost grids (e.g. 0.0001 share steps on a
+ternary blend, or hourly FLH x 0.05-day reserve surfaces). The grid is
+computed in fixed-size row tiles, each tile is written to a memory-mapped
+.npy file and handed to streaming reducers (minimum/argmin, histogram,
+contour lines), so memory use depends on the tile size only, not on the
+resolution. Cells outside the domain (e.g. beyond the simplex) are NaN.
+
+"""
+
+import numpy as np
+
+# Cells per tile: the cost kernels hold a few float64 temporaries per cell
+tile_cells = 2 ** 20
+
+
+def tiles(rows, tile_rows):
+    for r0 in range(0, rows, tile_rows):
+        yield r0, min(r0 + tile_rows, rows)
+
+
+def _tile_rows(shape, tile_rows):
+    return tile_rows or max(1, tile_cells // shape[1])
+
+
+def evaluate(f, shape, path=None, dtype=np.float32, tile_rows=None, reducers=()):
+    """
+    Evaluate a grid of `shape` (rows, cols) tile by tile.
+
+    f:         f(r0, r1) returning the (r1 - r0, cols) block of rows r0:r1
+    path:      .npy file the grid is written to (memory-mapped); None keeps nothing
+    reducers:  objects with update(r0, block), fed with every tile
+
+    Returns the memory-mapped grid (or None without a path).
+    """
+    grid = None
+    if path is not None:
+        grid = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=tuple(shape))
+    for r0, r1 in tiles(shape[0], _tile_rows(shape, tile_rows)):
+        block = np.asarray(f(r0, r1), dtype=dtype)
+        if grid is not None:
+            grid[r0:r1] = block
+        for r in reducers:
+            r.update(r0, block)
+    if grid is not None:
+        grid.flush()
+    return grid
+
+
+def scan(path, reducers, tile_rows=None):
+    """Feed a stored grid to reducers tile by tile, without loading it."""
+    grid = np.load(path, mmap_mode='r')
+    for r0, r1 in tiles(grid.shape[0], _tile_rows(grid.shape, tile_rows)):
+        block = np.asarray(grid[r0:r1])
+        for r in reducers:
+            r.update(r0, block)
+    return reducers
+
+
+class Minimum:
+    """Running minimum and its (row, col) position, NaN cells ignored."""
+
+    def __init__(self):
+        self.value, self.index = np.inf, None
+
+    def update(self, r0, block):
+        if np.isnan(block).all():
+            return
+        k = np.nanargmin(block)
+        if block.flat[k] < self.value:
+            self.value = float(block.flat[k])
+            self.index = (r0 + k // block.shape[1], k % block.shape[1])
+
+
+class Histogram:
+    """Running histogram over fixed bins (edges, or a count with a range), NaN cells ignored."""
+
+    def __init__(self, bins, range=None):
+        if np.ndim(bins) == 0 and range is None:
+            # Edges of an empty sample would default to [0, 1]
+            raise ValueError("Histogram needs a range when bins is a count")
+        self.edges = np.histogram_bin_edges([], bins=bins, range=range)
+        self.counts = np.zeros(len(self.edges) - 1, dtype=np.int64)
+
+    def update(self, r0, block):
+        values = block[~np.isnan(block)]
+        self.counts += np.histogram(values, bins=self.edges)[0]
+
+
+class Contours:
+    """
+    Contour lines of the grid at `levels`, as lists of (N, 2) vertex arrays in
+    (x, y) = (column, row) coordinates, or in the axis values when given.
+    Each tile is contoured together with the last row of the previous one, so
+    lines cross tile borders without gaps (split into pieces there).
+    """
+
+    def __init__(self, levels, x=None, y=None):
+        self.levels = list(levels)
+        self.x, self.y = x, y
+        self.lines = {level: [] for level in self.levels}
+        self._last = None
+
+    def update(self, r0, block):
+        import contourpy
+        if self._last is not None:
+            block, r0 = np.vstack((self._last, block)), r0 - 1
+        self._last = block[-1:].copy()
+        if len(block) < 2:
+            return
+        x = np.arange(block.shape[1]) if self.x is None else np.asarray(self.x)
+        y = np.arange(r0, r0 + len(block)) if self.y is None else np.asarray(self.y)[r0:r0 + len(block)]
+        gen = contourpy.contour_generator(x, y, np.ma.masked_invalid(block))
+        for level in self.levels:
+            self.lines[level].extend(gen.lines(level))
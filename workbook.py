@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""
+@author: Anas Abuzayed © 2025
+https://github.com/AnasAbuzayed/H2_CCGT
+
+Description:
+Cached access to Calculations.xlsx. Every sheet used by the figure scripts is
+parsed in a single pass over the workbook and stored as Parquet under
+.cache/workbook. The cache is reused until the workbook's SHA-256 changes
+(the file's size and mtime are checked first so unchanged files are not
+re-hashed). Without pyarrow the sheets are read directly with pandas.
+
+"""
+
+import datetime
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+import telemetry
+
+WORKBOOK = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Calculations.xlsx')
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'workbook')
+
+# Sheets read by the figure scripts, with the pd.read_excel options they use
+sheets = {
+    'Single Fuel_New': {},
+    'Firing Comparison': {},
+    'Keadby': dict(index_col=0, usecols=range(6), nrows=18),
+    'UK': dict(index_col=0, usecols=range(7), nrows=19),
+    'DE': dict(index_col=0, usecols=range(7), nrows=19),
+    'Inputs': {},
+    'Methods': {},
+    'LCOS': {},
+    'New_built_LCOE': {},
+    'Inflation_Adjustment': {},
+}
+
+_memo = {}
+
+
+def _options(kwargs):
+    return {k: list(v) if isinstance(v, range) else v for k, v in sorted(kwargs.items())}
+
+
+def _key(sheet_name, kwargs):
+    text = json.dumps([sheet_name, _options(kwargs)], sort_keys=True)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _plain(value):
+    # JSON-safe form of a cell read by pandas
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, (datetime.datetime, pd.Timestamp)):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, datetime.time):
+        return {'__time__': value.isoformat()}
+    return value
+
+
+def _restore(obj):
+    if '__datetime__' in obj:
+        return datetime.datetime.fromisoformat(obj['__datetime__'])
+    if '__time__' in obj:
+        return datetime.time.fromisoformat(obj['__time__'])
+    return obj
+
+
+def _encode(df):
+    """
+    Columnar form of a sheet: numeric columns are stored natively, object
+    columns (mixed text and numbers, as Excel sheets often are) as JSON text.
+    """
+    index = None if isinstance(df.index, pd.RangeIndex) and df.index.start == 0 and df.index.step == 1 \
+        else df.index.nlevels
+    meta = {'columns': [_plain(c) for c in df.columns],
+            'index': index,
+            'index_names': [_plain(n) for n in df.index.names] if index else None,
+            'json': []}
+    if index:
+        df = df.reset_index()
+    data = {}
+    for k in range(df.shape[1]):
+        col = df.iloc[:, k]
+        if col.dtype == object:
+            data[f'c{k}'] = [json.dumps(_plain(v)) for v in col]
+            meta['json'].append(k)
+        else:
+            data[f'c{k}'] = col.values
+    return pd.DataFrame(data, index=pd.RangeIndex(len(df))), meta
+
+
+def _decode(table, meta):
+    columns = {}
+    for k in range(table.shape[1]):
+        col = table[f'c{k}']
+        if k in meta['json']:
+            col = pd.Series([json.loads(v, object_hook=_restore) for v in col], dtype=object)
+        columns[k] = col
+    df = pd.DataFrame(columns)
+    n = meta['index'] or 0
+    names = [json.loads(json.dumps(c), object_hook=_restore) for c in meta['columns']]
+    if n:
+        df = df.set_index(list(range(n)))
+        df.index.names = meta['index_names']
+    df.columns = names
+    return df
+
+
+def _manifest_path():
+    return os.path.join(CACHE_DIR, 'manifest.json')
+
+
+def _load_manifest():
+    try:
+        with open(_manifest_path()) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _fingerprint(path, manifest):
+    # Reuse the stored hash while size and mtime are unchanged
+    stat = os.stat(path)
+    if manifest.get('size') == stat.st_size and manifest.get('mtime') == stat.st_mtime_ns:
+        return manifest['sha256']
+    return _sha256(path)
+
+
+def _build(path, requested, manifest, sha):
+    """Parse every registered sheet (and `requested`) in one pass and cache them."""
+    views = {_key(name, kw): (name, kw) for name, kw in sheets.items()}
+    views.update(requested)
+    if manifest.get('sha256') == sha:
+        views = {k: v for k, v in views.items() if k not in manifest.get('views', {})}
+    else:
+        manifest = {'views': {}}
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with telemetry.stage('parse workbook'), pd.ExcelFile(path) as xls:
+        for key, (name, kw) in views.items():
+            table, meta = _encode(pd.read_excel(xls, sheet_name=name, **kw))
+            table.to_parquet(os.path.join(CACHE_DIR, f'{key}.parquet'))
+            manifest['views'][key] = {'sheet': name, 'options': _options(kw), 'meta': meta}
+    stat = os.stat(path)
+    manifest.update({'sha256': sha, 'size': stat.st_size, 'mtime': stat.st_mtime_ns})
+    with open(_manifest_path(), 'w') as f:
+        json.dump(manifest, f, indent=1)
+    return manifest
+
+
+def read_excel(sheet_name, path=WORKBOOK, **kwargs):
+    """
+    Drop-in for pd.read_excel(path, sheet_name=..., **kwargs) served from the
+    Parquet cache. Each call returns a fresh DataFrame.
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        with telemetry.stage(f'parse {sheet_name}'):
+            return pd.read_excel(path, sheet_name=sheet_name, **kwargs)
+
+    key = _key(sheet_name, kwargs)
+    manifest = _load_manifest() if os.path.abspath(path) == WORKBOOK else {}
+    sha = _fingerprint(path, manifest)
+    if (sha, key) in _memo:
+        return _memo[(sha, key)].copy()
+    if os.path.abspath(path) != WORKBOOK:
+        with telemetry.stage(f'parse {sheet_name}'):
+            df = pd.read_excel(path, sheet_name=sheet_name, **kwargs)
+    else:
+        if manifest.get('sha256') != sha or key not in manifest.get('views', {}):
+            manifest = _build(path, {key: (sheet_name, kwargs)}, manifest, sha)
+        with telemetry.stage(f'read cache {sheet_name}'):
+            df = _decode(pd.read_parquet(os.path.join(CACHE_DIR, f'{key}.parquet')),
+                         manifest['views'][key]['meta'])
+    _memo[(sha, key)] = df
+    return df.copy()
+
+
+def digest(sheet_name, path=WORKBOOK, **kwargs):
+    """
+    SHA-256 of the content of one sheet view (as returned by read_excel), so
+    callers can tell whether the data they depend on has changed.
+    """
+    df = read_excel(sheet_name, path=path, **kwargs)
+    h = hashlib.sha256(json.dumps([_plain(c) for c in df.columns]).encode('utf-8'))
+    h.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return h.hexdigest()